@@ -15,10 +15,12 @@
 #
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import argparse
 import io
+import mmap
 import sys
 from pathlib import Path
-from typing import TextIO, BinaryIO
+from typing import TextIO, BinaryIO, Optional, cast
 
 from parser import PDFParser
 from tool import TextProcessor, extract_text, RawTextProcessor
@@ -28,25 +30,43 @@ SPACE = 0x20
 STARTXREF = b'startxref'
 LEN_STARTXREF = len(STARTXREF)
 
+OUTPUT_BUFFER_SIZE = 1 << 20
 
-def main(path: Path):
-    if args.processor == "R":
-        processor = RawTextProcessor()
-    else:
-        processor = TextProcessor()
+
+PROCESSOR_CLASS_BY_CODE = {
+    "N": TextProcessor,
+    "R": RawTextProcessor,
+}
+
+
+def main(args: argparse.Namespace):
+    processor = PROCESSOR_CLASS_BY_CODE[args.processor]()
     if args.input is None:
-        if args.output is None:
-            extract(processor, sys.stdin.buffer, sys.stdout)
-        else:
-            with Path(args.output).open("w", encoding="utf-8") as d:
-                extract(processor, sys.stdin.buffer, d)
+        # the parser needs to seek
+        s = io.BytesIO(sys.stdin.buffer.read())
+        with _open_output(args.output) as d:
+            extract(processor, s, d)
     else:
-        with Path(args.input).open("rb") as s:
-            if args.output is None:
-                extract(processor, s, sys.stdout)
-            else:
-                with Path(args.output).open("w", encoding="utf-8") as d:
-                    extract(processor, s, d)
+        with Path(args.input).open("rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ) as s:
+            if hasattr(s, "madvise"):  # objects are read at random offsets
+                s.madvise(mmap.MADV_RANDOM)
+            with _open_output(args.output) as d:
+                extract(processor, cast(BinaryIO, s), d)
+
+
+def _open_output(output: Optional[str]) -> TextIO:
+    """
+    The text is written by small chunks: use a large buffer, even for the
+    stdout.
+    """
+    if output is None:
+        sys.stdout.flush()
+        return open(sys.stdout.fileno(), "w", encoding="utf-8",
+                    buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+    else:
+        return Path(output).open("w", encoding="utf-8",
+                                 buffering=OUTPUT_BUFFER_SIZE)
 
 
 def extract(processor: TextProcessor, s: BinaryIO, d: TextIO):
@@ -56,18 +76,10 @@ def extract(processor: TextProcessor, s: BinaryIO, d: TextIO):
 
 
 if __name__ == '__main__':
-    import argparse
-
     parser = argparse.ArgumentParser()
     parser.add_argument("-p", "--processor", type=str, choices=["N", "R"],
-                        required=False,
+                        default="N",
                         help="processor file, N for normal, R for raw")
     parser.add_argument("-i", "--input", type=str, help="input file, stdin if absent")
     parser.add_argument("-o", "--output", type=str, help="output file, stdout if absent")
-    parser.parse_args()
-    args = parser.parse_args()
-    main(args)
-
-    print(args.processor, args.input, args.output)
-    # TODO : option for text processor
-    # main(Path(sys.argv[1]))
+    main(parser.parse_args())
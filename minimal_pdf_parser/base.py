@@ -16,53 +16,67 @@
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import logging
-import typing
-from typing import NamedTuple, List, Any, Dict, Union, TypeVar, Type, cast
+from enum import IntEnum
+from typing import (
+    NamedTuple, List, Any, Dict, Union, TypeVar, Type, cast, Optional)
 
 
-class _OpenDictTokenClass:
-    def __repr__(self):
-        return "OpenDictToken"
-
-
-class _CloseDictTokenClass:
-    def __repr__(self):
-        return "CloseDictToken"
-
-
-class _OpenArrayTokenClass:
-    def __repr__(self):
-        return "OpenArrayToken"
-
+class _StructuralToken(IntEnum):
+    """The delimiters of dicts and arrays. Members are singletons."""
+    OpenDictToken = 1
+    CloseDictToken = 2
+    OpenArrayToken = 3
+    CloseArrayToken = 4
 
-class _CloseArrayTokenClass:
     def __repr__(self):
-        return "CloseArrayToken"
+        return self.name
 
 
-OpenDictToken = _OpenDictTokenClass()
-CloseDictToken = _CloseDictTokenClass()
-OpenArrayToken = _OpenArrayTokenClass()
-CloseArrayToken = _CloseArrayTokenClass()
+OpenDictToken = _StructuralToken.OpenDictToken
+CloseDictToken = _StructuralToken.CloseDictToken
+OpenArrayToken = _StructuralToken.OpenArrayToken
+CloseArrayToken = _StructuralToken.CloseArrayToken
 
 
 class StringObject:
+    __slots__ = ("bs",)
+
     def __init__(self, bs: bytes):
         self.bs = bs
 
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not StringObject:
+            return NotImplemented
+        return self.bs == other.bs
+
+    def __hash__(self) -> int:
+        return hash(self.bs)
+
     def __repr__(self) -> str:
         return "StringObject({})".format(self.bs)
 
 
 class NameObject:
+    __slots__ = ("bs",)
+
     def __init__(self, bs: bytes):
         self.bs = bs
 
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not NameObject:
+            return NotImplemented
+        return self.bs == other.bs
+
+    def __hash__(self) -> int:
+        return hash(self.bs)
+
     def __repr__(self) -> str:
         return "NameObject({})".format(self.bs)
 
 
 class WordToken:
+    __slots__ = ("bs",)
+
     def __init__(self, bs: bytes):
         self.bs = bs
 
@@ -70,35 +84,24 @@ class WordToken:
         return "WordToken({})".format(self.bs)
 
 
-class ArrayObject:
+class ArrayObject(list):
+    __slots__ = ()
+
     def __init__(self, arr: List[Any]):
-        self._arr = arr
+        list.__init__(self, arr)
 
     def __repr__(self) -> str:
-        return "ArrayObject(arr={})".format(self._arr)
+        return "ArrayObject(arr={})".format(list.__repr__(self))
 
-    def __iter__(self):
-        return self._arr.__iter__()
 
+class DictObject(dict):
+    __slots__ = ()
 
-class DictObject:
     def __init__(self, d: Dict[bytes, "PDFObject"]):
-        self._d = d
+        dict.__init__(self, d)
 
     def __repr__(self) -> str:
-        return "DictObject(obj={})".format(repr(self._d))
-
-    def __getitem__(self, item: bytes) -> "PDFObject":
-        return self._d.__getitem__(item)
-
-    def __contains__(self, item: bytes) -> bool:
-        return self._d.__contains__(item)
-
-    def get(self, item: bytes, default_value=None) -> "PDFObject":
-        return self._d.get(item, default_value)
-
-    def items(self) -> typing.ItemsView[bytes, "PDFObject"]:
-        return self._d.items()
+        return "DictObject(obj={})".format(dict.__repr__(self))
 
 
 BooleanObject = NamedTuple("BooleanObject", [("value", bool)])
@@ -111,18 +114,30 @@ null_object_instance = NullObject()
 
 
 class NumberObject:
-    def __init__(self, bs: bytes):
+    __slots__ = ("_bs", "_is_real", "_value")
+
+    def __init__(self, bs: bytes, is_real: Optional[bool] = None):
+        """
+        :param bs: the text of the number
+        :param is_real: True if the text contains a dot. Computed if None.
+        """
         self._bs = bs
+        self._is_real = b"." in bs if is_real is None else is_real
+        self._value = None
 
     def __repr__(self) -> str:
         return "NumberObject(text={})".format(repr(self._bs))
 
     @property
     def value(self) -> Union[int, float]:
-        if b"." in self._bs:
-            return float(self._bs)
-        else:
-            return int(self._bs)
+        value = self._value
+        if value is None:
+            if self._is_real:
+                value = float(self._bs)
+            else:
+                value = int(self._bs)
+            self._value = value
+        return value
 
 
 class IndirectRef:
@@ -193,6 +208,17 @@ def get_string(dict_object: DictObject, key: bytes,
     return value
 
 
+def get_bool(dict_object: DictObject, key: bytes,
+             default_value: bool = None) -> bool:
+    try:
+        value = checked_cast(BooleanObject, dict_object[key]).value
+    except KeyError:
+        if default_value is None:
+            raise
+        value = default_value
+    return value
+
+
 def check(value: bool, format_string: str, *parameters):
     if not value:
         raise Exception(format_string.format(*parameters))
@@ -208,6 +234,8 @@ def checked_cast(typ: Type[T], val: Any) -> T:
 
 
 class TextMatrix:
+    __slots__ = ("a", "b", "c", "d", "e", "f")
+
     _logger = logging.getLogger(__name__)
 
     @staticmethod
@@ -223,18 +251,27 @@ class TextMatrix:
         self.f = f
 
     def __mul__(self, other: "TextMatrix") -> "TextMatrix":
-        return TextMatrix(self.a * other.a + self.b * other.c,
-                          self.a * other.b + self.b * other.d,
-                          self.c * other.a + self.d * other.c,
-                          self.c * other.b + self.d * other.d,
-                          self.e * other.a + self.f * other.c + other.e,
-                          self.e * other.b + self.f * other.d + other.f
+        a, b, c, d, e, f = self.a, self.b, self.c, self.d, self.e, self.f
+        oa, ob, oc, od = other.a, other.b, other.c, other.d
+        if oa == 1 and ob == 0 and oc == 0 and od == 1:  # translation
+            return TextMatrix(a, b, c, d, e + other.e, f + other.f)
+        if a == 1 and b == 0 and c == 0 and d == 1:  # translation
+            return TextMatrix(oa, ob, oc, od,
+                              e * oa + f * oc + other.e,
+                              e * ob + f * od + other.f)
+        return TextMatrix(a * oa + b * oc,
+                          a * ob + b * od,
+                          c * oa + d * oc,
+                          c * ob + d * od,
+                          e * oa + f * oc + other.e,
+                          e * ob + f * od + other.f
                           )
 
     def shift(self, w: float, h: float):
         self.e += w * self.a + h * self.c
         self.f += w * self.b + h * self.d
-        self._logger.debug(">> Shift > cur text matrix is: %s", self)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(">> Shift > cur text matrix is: %s", self)
 
     def __repr__(self):
         return repr(
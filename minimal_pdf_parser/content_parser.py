@@ -16,83 +16,149 @@
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import logging
-from typing import Iterator, Mapping
+import struct
+from typing import Iterator, Mapping, List, Sequence, Any, Dict, cast
 
 from base import (WordToken, ArrayObject, checked_cast, NumberObject,
-                  StringObject)
-from pdf_operator import (Operation, TokenQueue, operator_by_token_bytes,
-                          )
-from tokenizer import (PDFTokenizer, StreamWrapper)
+                  StringObject, OpenArrayToken, CloseArrayToken)
+from pdf_operator import Operation, TokenQueue, build_by_token_bytes
+from tokenizer import PDFTokenizer
 
 
 class ContentParser:
     _logger = logging.getLogger(__name__)
 
-    def parse_content(self, stream_wrapper: StreamWrapper
-                      ) -> Iterator[Operation]:
+    def parse_content(self, data: bytes) -> Iterator[Operation]:
         stack = TokenQueue()
+        push = stack.push
+        get_build = build_by_token_bytes.get
 
         # See : Table A.1 – PDF content stream operators
-        for token in PDFTokenizer(stream_wrapper):
-            if isinstance(token, WordToken):
+        for token in PDFTokenizer.from_bytes(data):
+            if token.__class__ is WordToken:
                 token_bytes = token.bs
-                try:
-                    operator = operator_by_token_bytes[token_bytes]
-                    for operation in operator.build(stack):
-                        yield operation
-                except KeyError:
+                build = get_build(token_bytes)
+                if build is None:
                     self._logger.warning("Unk token name %s", token_bytes)
+                else:
+                    yield from build(stack)
             else:
-                stack.push(token)
+                push(token)
 
-    def parse_to_unicode(self, stream_wrapper: StreamWrapper
-                         ) -> Mapping[int, str]:
+    def parse_to_unicode(self, data: bytes) -> Mapping[int, str]:
         """
         9.7.5.4 CMap Example and Operator Summary
 
-        :param stream_wrapper:
+        :param data: the inflated CMap stream
         :return:
         """
         stack = []
+        get_handler = _CMAP_HANDLER_BY_TOKEN_BYTES.get
 
-        fchar_count = 0
-        frange_count = 0
-        encoding = {}
-        for token in PDFTokenizer(stream_wrapper):
-            if isinstance(token, WordToken):
-                token_bytes = token.bs
-                if token_bytes == b"beginbfchar":
-                    fchar_count = checked_cast(NumberObject, stack[0]).value
-                elif token_bytes == b"endbfchar":
-                    for i in range(0, fchar_count, 2):
-                        first = checked_cast(StringObject, stack[i]).bs
-                        second = checked_cast(StringObject, stack[i + 1]).bs
-                        code = int.from_bytes(first, "big")
-                        encoding[code] = second.decode("utf-16-be")
-                elif token_bytes == b"beginbfrange":
-                    frange_count = checked_cast(NumberObject, stack[0]).value
-                elif token_bytes == b"endbfrange":
-                    for i in range(0, frange_count, 3):
-                        first = checked_cast(StringObject, stack[i]).bs
-                        second = checked_cast(StringObject, stack[i + 1]).bs
-                        third = stack[i + 2]
-                        first_code = int.from_bytes(first, "big")
-                        second_code = int.from_bytes(second, "big")
-                        if isinstance(third, ArrayObject):
-                            for code, value in enumerate(third, first_code):
-                                bs = checked_cast(StringObject, value).bs
-                                encoding[code] = bs.decode("utf-16-be")
-                        elif isinstance(third, StringObject):
-                            cur_value = third.bs.decode("utf-16-be")
-                            for code in range(first_code, second_code):
-                                encoding[code] = cur_value
-                                cur_value = chr(ord(cur_value) + 1)
-                        else:
-                            raise ValueError()
-
+        state = _CMapState()
+        array_start = 0
+        for token in PDFTokenizer.from_bytes(data):
+            if token.__class__ is WordToken:
+                handler = get_handler(token.bs)
+                if handler is not None:
+                    handler(stack, state)
                 stack = []
+            elif token is OpenArrayToken:
+                array_start = len(stack)
+            elif token is CloseArrayToken:
+                stack[array_start:] = [ArrayObject(stack[array_start:])]
             else:
                 stack.append(token)
-        return encoding
+        return state.encoding
+
+
+class _CMapState:
+    """The state of a ToUnicode CMap parsing"""
+
+    def __init__(self):
+        self.fchar_count = 0
+        self.frange_count = 0
+        self.encoding = cast(Dict[int, str], {})
+
+
+def _begin_bf_char(stack: List[Any], state: _CMapState):
+    state.fchar_count = checked_cast(NumberObject, stack[0]).value
+
+
+def _end_bf_char(stack: List[Any], state: _CMapState):
+    encoding = state.encoding
+    fchar_count = state.fchar_count
+    firsts = stack[0:2 * fchar_count:2]
+    seconds = [checked_cast(StringObject, second).bs
+               for second in stack[1:2 * fchar_count:2]]
+    for first, value in zip(firsts, _decode_utf16(seconds)):
+        code = _to_code(checked_cast(StringObject, first).bs)
+        encoding[code] = value
+
+
+def _begin_bf_range(stack: List[Any], state: _CMapState):
+    state.frange_count = checked_cast(NumberObject, stack[0]).value
+
+
+def _end_bf_range(stack: List[Any], state: _CMapState):
+    encoding = state.encoding
+    for i in range(0, 3 * state.frange_count, 3):
+        first = checked_cast(StringObject, stack[i]).bs
+        second = checked_cast(StringObject, stack[i + 1]).bs
+        third = stack[i + 2]
+        first_code = _to_code(first)
+        second_code = _to_code(second)
+        if isinstance(third, ArrayObject):
+            values = [checked_cast(StringObject, value).bs for value in third]
+            encoding.update(enumerate(_decode_utf16(values), first_code))
+        elif isinstance(third, StringObject):
+            # the last char is incremented
+            value = third.bs.decode("utf-16-be")
+            prefix = value[:-1]
+            delta = ord(value[-1]) - first_code
+            encoding.update({
+                code: prefix + chr(delta + code)
+                for code in range(first_code, second_code + 1)
+            })
+        else:
+            raise ValueError()
+
+
+# 9.7.5.4 CMap Example and Operator Summary
+_CMAP_HANDLER_BY_TOKEN_BYTES = {
+    b"beginbfchar": _begin_bf_char,
+    b"endbfchar": _end_bf_char,
+    b"beginbfrange": _begin_bf_range,
+    b"endbfrange": _end_bf_range,
+}
+
+
+_UNPACK_UINT16 = struct.Struct(">H").unpack
+
+
+def _to_code(bs: bytes) -> int:
+    """
+    Convert a big-endian source code to an int. Codes are one or two bytes
+    long in most CMaps.
+    """
+    length = len(bs)
+    if length == 2:
+        return _UNPACK_UINT16(bs)[0]
+    elif length == 1:
+        return bs[0]
+    else:
+        return int.from_bytes(bs, "big")
+
+
+def _decode_utf16(values: List[bytes]) -> Sequence[str]:
+    """
+    Decode a list of UTF-16BE values. The common case (one code unit per
+    value) is decoded with a single call.
+    """
+    if all(len(value) == 2 for value in values):
+        chars = b"".join(values).decode("utf-16-be")
+        if len(chars) == len(values):  # no surrogate pair across two values
+            return chars
+    return [value.decode("utf-16-be") for value in values]
 
 
@@ -16,7 +16,7 @@
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import logging
-from typing import Mapping, cast, Dict, Any
+from typing import Mapping, cast, Dict, Any, Tuple
 
 from base import (checked_cast, DictObject, IndirectRef, NameObject,
                   ArrayObject,
@@ -27,19 +27,56 @@ from pdf_encodings import STD_ENCODING, ENCODING_BY_NAME
 Encoding = Mapping[int, str]
 Widths = Mapping[int, float]
 
+# codes above this limit (CID fonts) are looked up in the widths mapping
+MAX_DENSE_WIDTHS = 4096
+
 class Font:
     def __init__(self, encoding: Encoding, widths: Widths, missing_width: float):
         self.encoding = encoding
         self.widths = widths
         self.missing_width = missing_width
+        dense_len = min(max(widths, default=-1) + 1, MAX_DENSE_WIDTHS)
+        self._dense_widths = [missing_width] * dense_len
+        for i, width in widths.items():
+            if i < dense_len:
+                self._dense_widths[i] = width
+        self._decoding_table = None
+        self._byte_widths = None
+
+    def decode(self, bs: bytes) -> str:
+        """
+        :param bs: one byte codes
+        :return: the text. NUL codes are dropped, unknown codes are U+FFFD
+        """
+        table = self._decoding_table
+        if table is None:  # a char by code, for str.translate
+            get = self.encoding.get
+            table = [get(i, '\ufffd') for i in range(256)]
+            table[0] = ""
+            self._decoding_table = table
+        return bs.decode("latin-1").translate(table)
 
     def get_space_width(self) -> float:
         return self.get_char_width(" ")
     def get_char_width(self, c: str) -> float:
-        return self.widths.get(ord(c), self.missing_width)
+        return self.get_pos_width(ord(c))
 
     def get_pos_width(self, i: int) -> float:
-        return self.widths.get(i, self.missing_width)
+        try:
+            return self._dense_widths[i]
+        except IndexError:
+            return self.widths.get(i, self.missing_width)
+
+    def get_bytes_width(self, bs: bytes) -> float:
+        """
+        :param bs: one byte codes
+        :return: the sum of the widths of the codes
+        """
+        widths = self._byte_widths
+        if widths is None:
+            widths = [self.get_pos_width(i) for i in range(256)]
+            self._byte_widths = widths
+        return sum(map(widths.__getitem__, bs))
 
     def is_space(self, i: int) -> bool:
         return self.encoding.get(i) == " "
@@ -62,21 +99,23 @@ class FontParser:
         self._unicode_by_glyph_name = unicode_by_glyph_name
         self._encoding_by_name = encoding_by_name
         self._font_by_obj_num = cast(Dict[int, Font], {})
+        self._to_unicode_by_obj_num = cast(Dict[int, Encoding], {})
+        self._widths_by_key = cast(Dict[Tuple[int, int, int], Widths], {})
         self._font_by_name = {}
 
     def parse(self, v: Any) -> Font:
-        font_object = checked_cast(DictObject, self._document.get_object(v))
-        if isinstance(font_object, IndirectRef):
-            obj_num = font_object.obj_num
+        if isinstance(v, IndirectRef):
+            obj_num = v.obj_num
             try:
                 return self._font_by_obj_num[obj_num]
             except KeyError:
-                font_object = self._document.deref_object(font_object)
+                font_object = checked_cast(DictObject,
+                                           self._document.deref_object(v))
                 font = self.parse_font_object(font_object)
                 self._font_by_obj_num[obj_num] = font
                 return font
         else:
-            return self.parse_font_object(font_object)
+            return self.parse_font_object(checked_cast(DictObject, v))
 
     def parse_font_object(self,
                           font_object: DictObject) -> Font:
@@ -116,41 +155,69 @@ class FontParser:
         """ 9.7 Composite Fonts
         Table 121 – Entries in a Type 0 font dictionary
         """
-        encoding = self._parse_type0_encoding(font_object)
+        encoding = self._parse_encoding(font_object, True)
         widths = {} # TODO
         missing_width = 0.0
         return Font(encoding, widths, missing_width)
 
-    def _parse_type0_encoding(self, font_object: DictObject) -> Encoding:
+    def _parse_encoding(self, font_object: DictObject,
+                        allow_to_unicode: bool) -> Encoding:
+        """
+        9.6.6 Character Encoding
+
+        :param font_object: the font dict
+        :param allow_to_unicode: if True, a name that is not a predefined
+        encoding falls back to the /ToUnicode CMap (Type 0 fonts). Else, the
+        encoding is empty.
+        :return: the encoding
+        """
         try:
-            encoding_object_or_ref = font_object[b"/Encoding"]
+            encoding_object = self._document.get_object(
+                font_object[b"/Encoding"])
         except KeyError:
+            # try with b"/ToUnicode"
             return STD_ENCODING
         else:
-            encoding_object = self._document.get_object(encoding_object_or_ref)
+            self._logger.debug("Parse Font Encoding: %s", encoding_object)
             if isinstance(encoding_object, NameObject):
                 encoding_name = cast(NameObject, encoding_object).bs
                 try:
-                    encoding = ENCODING_BY_NAME[encoding_name]
-                    return encoding
+                    return ENCODING_BY_NAME[encoding_name]
                 except KeyError:
-                    try:
-                        to_unicode_stream_wrapper = self._document.get_stream(
-                            font_object[b"/ToUnicode"])
-                    except KeyError:
-                        raise
-                    else:
-                        # 9.10.3 ToUnicode CMaps
-                        encoding = ContentParser().parse_to_unicode(
-                            to_unicode_stream_wrapper)
-                        self._logger.info("To Unicode: %s", encoding)
-                        return encoding  # TODO apply to base encoding
+                    if allow_to_unicode:
+                        return self._parse_to_unicode(
+                            font_object[b"/ToUnicode"]
+                        )  # TODO apply to base encoding
+                    return {}
             elif isinstance(encoding_object, DictObject):
                 base_encoding = self._get_base1_encoding(encoding_object)
+                self._logger.debug("Base Encoding is: %s",
+                                   base_encoding)
                 return self._apply_differences(encoding_object, base_encoding)
             else:
                 raise ValueError()
 
+    def _parse_to_unicode(self, to_unicode: Any) -> Encoding:
+        """
+        9.10.3 ToUnicode CMaps
+        """
+        if isinstance(to_unicode, IndirectRef):
+            obj_num = to_unicode.obj_num
+            try:
+                return self._to_unicode_by_obj_num[obj_num]
+            except KeyError:
+                encoding = self._read_to_unicode(to_unicode)
+                self._to_unicode_by_obj_num[obj_num] = encoding
+                return encoding
+        else:
+            return self._read_to_unicode(to_unicode)
+
+    def _read_to_unicode(self, to_unicode: Any) -> Encoding:
+        to_unicode_data = self._document.get_stream_data(to_unicode)
+        encoding = ContentParser().parse_to_unicode(to_unicode_data)
+        self._logger.info("To Unicode: %s", encoding)
+        return encoding
+
     def _check_type(self, encoding_object: DictObject):
         try:
             type_object = self._document.get_object(encoding_object[b"/Type"])
@@ -163,35 +230,11 @@ class FontParser:
 
     def _parse_type1_font(self, font_object: DictObject) -> Font:
         self._logger.debug("Parse Type 1 Font: %s", font_object)
-        encoding = self._parse_type1_encoding(font_object)
+        encoding = self._parse_encoding(font_object, False)
         widths = self._parse_widths(font_object)
         missing_width = self._get_missing_width(font_object)
         return Font(encoding, widths, missing_width)
 
-    def _parse_type1_encoding(self, font_object: DictObject) -> Encoding:
-        """
-        9.6.2 Type 1 Fonts
-        """
-        try:
-            encoding_object = self._document.get_object(
-                font_object[b"/Encoding"])
-        except KeyError:
-            # try with b"/ToUnicode"
-            return STD_ENCODING
-        else:
-            self._logger.debug("Parse Type 1 Font Encoding: %s", encoding_object)
-            if isinstance(encoding_object, NameObject):
-                encoding_name = cast(NameObject, encoding_object).bs
-                encoding = ENCODING_BY_NAME.get(encoding_name, [])
-                return encoding
-            elif isinstance(encoding_object, DictObject):
-                base_encoding = self._get_base1_encoding(encoding_object)
-                self._logger.debug("Base Encoding is: %s",
-                                   base_encoding)
-                return self._apply_differences(encoding_object, base_encoding)
-            else:
-                raise ValueError()
-
     # BaseFont
 
     def _get_base1_encoding(self, encoding_object) -> Encoding:
@@ -205,7 +248,7 @@ class FontParser:
             base_encoding = STD_ENCODING
         else:
             base_encoding_name = cast(NameObject, base_encoding_object).bs
-            base_encoding = ENCODING_BY_NAME.get(base_encoding_name, [])
+            base_encoding = ENCODING_BY_NAME.get(base_encoding_name, {})
         return base_encoding
 
     def _parse_truetype_font(self, font_object: DictObject) -> Font:
@@ -213,29 +256,11 @@ class FontParser:
         9.6.3 TrueType Fonts
         """
         self._logger.debug("Parse TrueType Font: %s", font_object)
-        encoding = self._parse_truetype_encoding(font_object)
+        encoding = self._parse_encoding(font_object, False)
         widths = self._parse_widths(font_object)
         missing_width = self._get_missing_width(font_object)
         return Font(encoding, widths, missing_width)
 
-    def _parse_truetype_encoding(self, font_object: DictObject) -> Encoding:
-        try:
-            encoding_object = self._document.get_object(
-                font_object[b"/Encoding"])
-        except KeyError:
-            # try with b"/ToUnicode"
-            return STD_ENCODING
-        else:
-            if isinstance(encoding_object, NameObject):
-                encoding_name = cast(NameObject, encoding_object).bs
-                encoding = ENCODING_BY_NAME.get(encoding_name, [])
-                return encoding
-            elif isinstance(encoding_object, DictObject):
-                base_encoding = self._get_base1_encoding(encoding_object)
-                self._logger.error("TODO enc %s", base_encoding)  # TODO
-            else:
-                raise ValueError()
-
     def _apply_differences(self, encoding_object: DictObject,
                            base_encoding: Encoding) -> Encoding:
         try:
@@ -246,16 +271,19 @@ class FontParser:
         else:
             encoding = dict(base_encoding)
             differences_array = cast(ArrayObject, differences)
+            get_unicode = self._unicode_by_glyph_name.get
+            debug = self._logger.isEnabledFor(logging.DEBUG)
             i = 0
             for element in differences_array:
-                if isinstance(element, NumberObject):
+                element_class = element.__class__
+                if element_class is NumberObject:
                     i = element.value
-                elif isinstance(element, NameObject):
+                elif element_class is NameObject:
                     element_name = element.bs
-                    self._logger.debug("Diff: %s %s",
-                                       i, element_name)
-                    encoding[i] = self._unicode_by_glyph_name.get(
-                        element_name, '\ufffd')
+                    if debug:
+                        self._logger.debug("Diff: %s %s",
+                                           i, element_name)
+                    encoding[i] = get_unicode(element_name, '\ufffd')
                     i += 1
                 else:
                     raise ValueError()
@@ -272,11 +300,26 @@ class FontParser:
         try:
             first_char = cast(NumberObject, font_object[b"/FirstChar"]).value
             last_char = cast(NumberObject, font_object[b"/LastChar"]).value
-            widths = cast(ArrayObject, self._document.get_object(font_object[b"/Widths"]))
+            widths_ref = font_object[b"/Widths"]
         except KeyError:
             return {}
+
+        if isinstance(widths_ref, IndirectRef):
+            key = (widths_ref.obj_num, first_char, last_char)
+            try:
+                return self._widths_by_key[key]
+            except KeyError:
+                widths = self._read_widths(widths_ref, first_char, last_char)
+                self._widths_by_key[key] = widths
+                return widths
         else:
-            return {i: checked_cast(NumberObject, no).value for i, no in zip(range(first_char, last_char + 1), widths)}
+            return self._read_widths(widths_ref, first_char, last_char)
+
+    def _read_widths(self, widths_ref: Any, first_char: int, last_char: int
+                     ) -> Widths:
+        widths = cast(ArrayObject, self._document.get_object(widths_ref))
+        values = [no.value for no in widths[:last_char + 1 - first_char]]
+        return dict(zip(range(first_char, last_char + 1), values))
 
     def _get_missing_width(self, font_object: DictObject) -> float:
         try:
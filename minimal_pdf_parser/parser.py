@@ -17,27 +17,43 @@
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import io
 import logging
-import re
 import zlib
+from collections import deque
 from typing import (
     BinaryIO, Iterator, Optional, Any, List, Dict, Mapping, cast, Tuple, Union,
-    Iterable
+    Iterable, Set
 )
 
 from base import (
     OpenDictToken, CloseDictToken, OpenArrayToken, CloseArrayToken,
     StringObject, NameObject, WordToken, ArrayObject, DictObject, BooleanObject,
     NullObject, IndirectRef, IndirectObject, StreamObject, get_num, get_string,
-    check, checked_cast, NumberObject, null_object_instance, TextMatrix
+    get_bool, check, checked_cast, NumberObject, null_object_instance,
+    TextMatrix
 )
 from font_parser import FontParser, Font
 from pdf_encodings import STD_ENCODING, ENCODING_BY_NAME, UNICODE_BY_GLYPH_NAME
 from security import StandardEncrypterFactory, Encrypter
-from tokenizer import (
-    PDFTokenizer, XrefEntry, BinaryStreamWrapper, LINE_FEED, CARRIAGE_RETURN,
-    _bytes_to_string, StreamWrapper)
+from tokenizer import PDFTokenizer, XrefEntry, LINE_FEED, CARRIAGE_RETURN
 
 BUF_SIZE = 40  # 96
+LINE_BUF_SIZE = 256
+RAW_STREAM_BUF_SIZE = 1 << 16
+XREF_ENTRY_SIZE = 20
+STREAM_BUF_SIZE = 1 << 16
+
+_OBJ = b"obj"
+_STREAM = b"stream"
+_ENDOBJ = b"endobj"
+_ENDSTREAM = b"endstream"
+_R = b"R"
+_OBJECT_BY_WORD = {
+    b"true": BooleanObject(True),
+    b"false": BooleanObject(False),
+    b"null": NullObject,
+}
+_VALUE_CLASSES = frozenset([StringObject, NumberObject, NameObject])
+_IDENTITY = (1, 0, 0, 1, 0, 0)
 
 IndirectOrStreamObject = Union[IndirectObject, StreamObject]
 PDFObject = Union[NullObject, IndirectObject, StreamObject, DictObject]
@@ -48,26 +64,6 @@ class StreamFactory:
         pass
 
 
-class DeflateStreamWrapper(StreamWrapper):
-    def __init__(self, window: Iterable[bytes]):
-        StreamWrapper.__init__(self)
-        self._it = iter(window)
-        self._decompressobj = zlib.decompressobj()
-        self._cur = b''
-        self._i = 0
-
-    def _get(self) -> int:
-        if self._i >= len(self._cur):
-            self._cur = b''
-            while not self._cur:
-                self._cur = self._decompressobj.decompress(next(self._it))
-            self._i = 0
-
-        ret = self._cur[self._i]
-        self._i += 1
-        return ret
-
-
 class PDFDocument:
     """A representation of a PDF self, after reading the xref table."""
     _logger = logging.getLogger(__name__)
@@ -86,9 +82,13 @@ class PDFDocument:
         self.encrypt = encrypt
         self.xref_table = xref_table
         self._obj_by_num = cast(Dict[int, Any], {})
+        self._deref_by_num = cast(Dict[int, PDFObject], {})
         self._offsets = cast(List[int], [])
+        self._doc_id_bytes = cast(Optional[Tuple[bytes, ...]], None)
+        self._encryption = cast(Optional[StandardEncrypterFactory], None)
         self._encrypter = cast(Optional[Encrypter], None)
         self._font_by_ref = cast(Dict[bytes, Font], {})
+        self._resources_refs = cast(Set[Tuple[int, int]], set())
 
     def get_root_object(self):
         return self.get_object(self.root)
@@ -100,36 +100,65 @@ class PDFDocument:
         :param obj: the obj or a ref.
         :return: the obj
         """
-        if isinstance(obj, IndirectRef):
+        if obj.__class__ is IndirectRef:
             return self.deref_object(obj)
         else:
             return obj
 
     def deref_object(self, obj: IndirectRef) -> PDFObject:
+        obj_num = obj.obj_num
+        try:
+            return self._deref_by_num[obj_num]
+        except KeyError:
+            pass
         try:
-            return self._get_indirect_object(obj).object
+            ret = self._get_indirect_object(obj).object
         except KeyError:
-            return null_object_instance
+            ret = null_object_instance
+        self._deref_by_num[obj_num] = ret
+        return ret
 
     def handle_fonts(self, kid_object):
         resources = kid_object[b"/Resources"]  # 7.8.3
+        if resources.__class__ is IndirectRef:
+            # pages often share their resources
+            key = (resources.obj_num, resources.gen_num)
+            if key in self._resources_refs:
+                return
+            self._resources_refs.add(key)
+            resources = self.deref_object(resources)
         for k, v in resources.get(b"/Font", {}).items():
             if k not in self._font_by_ref:
                 font = self._font_parser.parse(v)
                 self._logger.info("Font %s: %s", k, font)
                 self._font_by_ref[k] = font
 
-    def get_stream(self, obj: Any) -> StreamWrapper:
+    def get_stream_data(self, obj: Any) -> bytes:
+        """
+        :param obj: the stream or a ref
+        :return: the inflated data of the stream, as a block
+        """
+        stream_obj = self._get_stream_object(obj)
+        if stream_obj is None:
+            return b""
+        window = self.parser.stream_window(stream_obj, self._encrypter)
+        decompressobj = zlib.decompressobj()
+        parts = [decompressobj.decompress(chunk) for chunk in window]
+        parts.append(decompressobj.flush())
+        return b"".join(parts)
+
+    def _get_stream_object(self, obj: Any) -> Optional[StreamObject]:
+        """
+        :return: the stream object, None if the ref is not in the xref table
+        """
         if isinstance(obj, IndirectRef):
             try:
                 stream_obj = self._get_indirect_object(obj)
             except KeyError:
-                return BinaryStreamWrapper(io.BytesIO())
+                return None
         else:
             stream_obj = obj
-        checked_cast(StreamObject, stream_obj)
-        window = self.parser.stream_window(stream_obj, self._encrypter)
-        return DeflateStreamWrapper(window)
+        return checked_cast(StreamObject, stream_obj)
 
     def get_root_pages_kids(self):
         root_object = self.get_root_object()
@@ -142,29 +171,29 @@ class PDFDocument:
 
     def get_pages(self) -> Iterator[PDFObject]:
         kids = self.get_root_pages_kids()
-        stack = list(kids)
+        stack = deque(kids)
 
         while stack:
-            kid = stack.pop(0)
+            kid = stack.popleft()
             kid_object = self.get_object(kid)
             self._logger.debug("Examine kid: %s", kid_object)
             if b"/Contents" in kid_object:
                 yield kid_object
             else:  # kid is a page Node
                 kids = kid_object[b"/Kids"]
-                stack = list(kids) + stack
+                stack.extendleft(reversed(kids))
 
     def _get_indirect_object(self, ref: IndirectRef
                              ) -> IndirectOrStreamObject:
         """Convert a ref to an indirect object or a stream object"""
         obj_num = ref.obj_num
-        try:
-            return self._obj_by_num[obj_num]
-        except KeyError:
+        obj_by_num = self._obj_by_num
+        obj = obj_by_num.get(obj_num)
+        if obj is None:
+            # raises a KeyError if the object is not in the xref table
             byte_offset = int(self.xref_table[obj_num].byte_offset)
-
             obj = self.read_indirect_object(byte_offset)
-            self._obj_by_num[obj_num] = obj
+            obj_by_num[obj_num] = obj
         return obj
 
     def read_indirect_object(self, byte_offset: int
@@ -175,10 +204,10 @@ class PDFDocument:
         # TODO: create tokenizer ? TODO: encrypter
         obj = self.parser.read_object()
         endobj_word = self._read_endobj_word()
-        if endobj_word == b"stream":  # open a stream
+        if endobj_word == _STREAM:  # open a stream
             start, length = self._read_stream(obj)
             ret = StreamObject(obj_num, gen_num, obj, start, length)
-        elif endobj_word == b"endobj":
+        elif endobj_word == _ENDOBJ:
             ret = IndirectObject(obj_num, gen_num, obj)
         else:
             raise Exception(endobj_word)
@@ -196,17 +225,19 @@ class PDFDocument:
     def _read_stream(self, obj: Any) -> Tuple[int, int]:
         start = self.parser.tell()
         obj = checked_cast(DictObject, obj)
-        length_obj = checked_cast(NumberObject,
-                                  self.get_object(obj[b"/Length"]))
+        length_obj = obj[b"/Length"]
+        if length_obj.__class__ is not NumberObject:  # an indirect length
+            length_obj = checked_cast(NumberObject,
+                                      self.get_object(length_obj))
         length = length_obj.value
         self.parser.seek(length, io.SEEK_CUR)
         end_stream_word = self.parser.read_endobj_line()
         if not end_stream_word:
             end_stream_word = self.parser.read_endobj_line()
-        self.parser.check(end_stream_word == b"endstream",
+        self.parser.check(end_stream_word == _ENDSTREAM,
                           "Expected `endstream`, was {}", end_stream_word)
         endobj_word = self.parser.read_endobj_line()
-        self.parser.check(endobj_word == b"endobj", "")
+        self.parser.check(endobj_word == _ENDOBJ, "")
         return start, length
 
     def parse_encryption(self,
@@ -233,24 +264,22 @@ class PDFDocument:
         hashed_owner_and_user_passwd = get_string(encryption, b"/O")
         hashed_user_passwd = get_string(encryption, b"/U")
         permissions = get_num(encryption, b"/P", 0)
-        # encrypt_metadata = checked_cast(BooleanObject,
-        #                                 encryption[b"EncryptMetadata"]).value
+        encrypt_metadata = get_bool(encryption, b"/EncryptMetadata", True)
 
-        doc_id = [checked_cast(StringObject, self.get_object(o)).bs for o in
-                  checked_cast(ArrayObject, self.doc_id)]
+        doc_id = self._get_doc_id()
 
         if version == 1:
             length = 40
             return StandardEncrypterFactory(
                 doc_id, version, revision_num, length, permissions,
                 hashed_owner_and_user_passwd,
-                hashed_user_passwd)
+                hashed_user_passwd, encrypt_metadata)
         elif version == 2 or version == 3:
             length = get_num(encryption, b"/Length", 40)
             return StandardEncrypterFactory(
                 doc_id, version, revision_num, length, permissions,
                 hashed_owner_and_user_passwd,
-                hashed_user_passwd)
+                hashed_user_passwd, encrypt_metadata)
         elif version == 4:
             # TODO
             cf = encryption[b"/CF"]
@@ -264,17 +293,30 @@ class PDFDocument:
     def get_font(self, name: bytes) -> Font:
         return self._font_by_ref.get(name, Font(STD_ENCODING, {}, 0.0))
 
+    def _get_doc_id(self) -> Tuple[bytes, ...]:
+        if self._doc_id_bytes is None:
+            self._doc_id_bytes = tuple(
+                checked_cast(StringObject, self.get_object(o)).bs
+                for o in checked_cast(ArrayObject, self.doc_id))
+        return self._doc_id_bytes
+
     def prepare_decryption(self):
-        if self.encrypt is not None:
-            encryption = self.parse_encryption(
+        if self.encrypt is None or self._encrypter is not None:
+            return
+        if self._encryption is None:
+            self._encryption = self.parse_encryption(
                 self.get_object(self.encrypt))
-            self._encrypter = encryption.create()
-            PDFDocument._logger.debug("Encryption key found: %s",
-                                      self._encrypter.encryption_key)
+        self._encrypter = self._encryption.create()
+        PDFDocument._logger.debug("Encryption key found: %s",
+                                  self._encrypter.encryption_key)
+
 
 class PDFParser:
     def __init__(self, stream: BinaryIO):
+        if isinstance(stream, io.RawIOBase):  # avoid a syscall per read
+            stream = io.BufferedReader(stream, RAW_STREAM_BUF_SIZE)
         self._stream = stream
+        self._object_parser = ObjectParser()
 
     def tell(self) -> int:
         return self._stream.tell()
@@ -301,18 +343,25 @@ class PDFParser:
             doc_id = trailer_dict[b"/ID"]
 
         # look for previous xref tables
+        xref_tables = [xref_table]
+        seen_start_xrefs = {start_xref}
         while True:
             try:
                 other_start_xref = trailer_dict[b"/Prev"].value
             except KeyError:
                 break
+            if other_start_xref in seen_start_xrefs:  # a /Prev loop
+                break
+            seen_start_xrefs.add(other_start_xref)
 
-            other_xref_table = self.get_xref_table(other_start_xref)
+            xref_tables.append(self.get_xref_table(other_start_xref))
             trailer_dict = self.read_dict()
-            for k, v in other_xref_table.items():
-                # fill the missing elements
-                if k not in xref_table:
-                    xref_table[k] = v
+
+        if len(xref_tables) > 1:
+            # merge from the oldest table: the most recent entries win
+            xref_table = {}
+            for other_xref_table in reversed(xref_tables):
+                xref_table.update(other_xref_table)
         return PDFDocument(self, doc_id, size, root, encrypt, xref_table)
 
     def get_xref_table(self, start_xref: int) -> Dict[int, XrefEntry]:
@@ -339,10 +388,22 @@ class PDFParser:
         entry_by_ref_num = {}
         while line and line != b"trailer":
             off, n = map(int, line.split())
-            for i in range(off, off + n):
-                line = self.readline()
-                byte_offset, gen_number, kw = line.split()
-                entry_by_ref_num[i] = XrefEntry(byte_offset, gen_number, kw)
+            # 7.5.4: each entry is exactly 20 bytes long, EOL included
+            size = n * XREF_ENTRY_SIZE
+            buf = self._stream.read(size)
+            if _is_xref_subsection(buf, n):
+                entry_by_ref_num.update(
+                    (i, XrefEntry(buf[k:k + 10], buf[k + 11:k + 16],
+                                  buf[k + 17:k + 18]))
+                    for i, k in zip(range(off, off + n),
+                                    range(0, size, XREF_ENTRY_SIZE)))
+            else:  # malformed entries: read them line by line
+                self._stream.seek(-len(buf), io.SEEK_CUR)
+                for i in range(off, off + n):
+                    line = self.readline()
+                    byte_offset, gen_number, kw = line.split()
+                    entry_by_ref_num[i] = XrefEntry(byte_offset, gen_number,
+                                                    kw)
             line = self.readline()
         return entry_by_ref_num
 
@@ -357,8 +418,12 @@ class PDFParser:
         raise Exception("Parser" + format_string.format(*parameters))
 
     def read_object(self):
+        object_parser = self._object_parser
         tokenizer = PDFTokenizer.create(self._stream)
-        return ObjectParser(tokenizer).parse()
+        object_parser.reset(tokenizer)
+        ret = object_parser.parse()
+        tokenizer.release()
+        return ret
 
     def _find_start_xref(self) -> int:
         """Find the startxref value.
@@ -389,7 +454,7 @@ class PDFParser:
     def read_obj_line(self) -> Tuple[bytes, bytes]:
         line = self.readline()
         obj_num, gen_num, obj_word = line.split()
-        assert obj_word == b"obj"
+        assert obj_word == _OBJ
         return obj_num, gen_num
 
     def read_endobj_line(self) -> bytes:
@@ -397,7 +462,6 @@ class PDFParser:
 
     def stream_window(self, stream_obj: StreamObject, encrypter: Encrypter
                       ) -> Iterable[bytes]:
-        self._stream.seek(stream_obj.start, io.SEEK_SET)
         if encrypter is None:
             yield from self._stream_window(stream_obj)
         else:
@@ -407,128 +471,166 @@ class PDFParser:
                 yield ec.chunk(c)
 
     def _stream_window(self, stream_obj: StreamObject):
-        for i in range(0, stream_obj.length - BUF_SIZE, BUF_SIZE):
-            yield self._stream.read(BUF_SIZE)
-        yield self._stream.read(stream_obj.length % BUF_SIZE)
+        # seek before each read: other objects may be read between chunks
+        stream = self._stream
+        start = stream_obj.start
+        end = start + stream_obj.length
+        while start < end:
+            stream.seek(start, io.SEEK_SET)
+            chunk = stream.read(min(STREAM_BUF_SIZE, end - start))
+            if not chunk:
+                break
+            yield chunk
+            start += len(chunk)
+
+    def readline(self) -> bytes:
+        """
+        Read a line ended by LF, CR or CR LF. Blocks of LINE_BUF_SIZE bytes
+        are read and the stream is moved back to the start of the next line.
 
-    def readline(self):
-        cr = False
-        cs = []
+        :return: the line, without the EOL
+        """
+        stream = self._stream
+        parts = []
         while True:
-            bytes_read = self._stream.read(1)
-            if not bytes_read:
-                break
-            c = bytes_read[0]
-            if c == LINE_FEED:
-                break
+            buf = stream.read(LINE_BUF_SIZE)
+            if not buf:
+                return b"".join(parts)
+            lf_index = buf.find(b"\n")
+            cr_index = buf.find(b"\r", 0, None if lf_index == -1 else lf_index)
+            if cr_index == -1:
+                if lf_index == -1:
+                    parts.append(buf)
+                    continue
+                parts.append(buf[:lf_index])
+                stream.seek(lf_index + 1 - len(buf), io.SEEK_CUR)
+                return b"".join(parts)
+
+            parts.append(buf[:cr_index])
+            break
+
+        # skip the CRs and the LF that follows
+        i = cr_index + 1
+        while True:
+            if i == len(buf):
+                buf = stream.read(LINE_BUF_SIZE)
+                if not buf:
+                    return b"".join(parts)
+                i = 0
+            c = buf[i]
             if c == CARRIAGE_RETURN:
-                cr = True
-            elif cr:
-                self._stream.seek(-1, io.SEEK_CUR)
-                break
+                i += 1
             else:
-                cs.append(c)
+                if c == LINE_FEED:
+                    i += 1
+                stream.seek(i - len(buf), io.SEEK_CUR)
+                return b"".join(parts)
+
 
-        return _bytes_to_string(cs)
+def _is_xref_subsection(buf: bytes, n: int) -> bool:
+    """
+    :return: True if buf is made of n well-formed xref entries
+    """
+    return (len(buf) == n * XREF_ENTRY_SIZE
+            and buf[10::XREF_ENTRY_SIZE] == b" " * n
+            and buf[16::XREF_ENTRY_SIZE] == b" " * n
+            and not buf[17::XREF_ENTRY_SIZE].translate(None, b"nf")
+            and not buf[18::XREF_ENTRY_SIZE].translate(None, b" \r\n")
+            and not buf[19::XREF_ENTRY_SIZE].translate(None, b"\r\n"))
 
 
 def reverse_reader(stream: BinaryIO) -> Iterator[bytes]:
+    """
+    Yield the lines of the stream, from the last one to the first one.
+    A CR LF sequence is a single EOL.
+    """
     stream.seek(0, io.SEEK_END)
-    remainders = []
-    while True:
-        if stream.tell() == 0:
-            break
-
-        to_read = min(BUF_SIZE, stream.tell())
-        stream.seek(-to_read, io.SEEK_CUR)
-        buf = stream.read(to_read)
-        stream.seek(-to_read, io.SEEK_CUR)
-        lines = re.split(b"(\r|\n|\r\n)", buf)
-        if len(lines) == 1:  # no EOL
-            remainders.insert(0, lines[0])
-        else:
-            i = len(lines) - 1
-            yield lines[i] + b"".join(remainders)
-            i -= 2
-            while i > 0:
-                yield lines[i]
-                i -= 2
-            remainders = [lines[i]]
-
-    yield b"".join(remainders)
+    pos = stream.tell()  # mmap.seek returns None
+    tail = b""
+    while pos:
+        to_read = min(BUF_SIZE, pos)
+        pos -= to_read
+        stream.seek(pos)
+        buf = stream.read(to_read) + tail
+        # an EOL at 0 might be the LF of a CR LF: wait for the next block
+        limit = 1 if pos else 0
+        end = len(buf)
+        i = max(buf.rfind(b"\n", 0, end), buf.rfind(b"\r", 0, end))
+        while i >= limit:
+            yield buf[i + 1:end]
+            if i and buf[i] == 0x0A and buf[i - 1] == 0x0D:
+                i -= 1
+            end = i
+            i = max(buf.rfind(b"\n", 0, end), buf.rfind(b"\r", 0, end))
+        tail = buf[:end]
+
+    yield tail
 
 
 class ObjectParser:
     """Parser for PDF objects"""
 
-    def __init__(self, tokenizer: PDFTokenizer):
+    def __init__(self, tokenizer: Optional[PDFTokenizer] = None):
+        self._stack = cast(List[List[Any]], [])
+        self._open_tokens = cast(List[Any], [])
+        if tokenizer is not None:
+            self.reset(tokenizer)
+
+    def reset(self, tokenizer: PDFTokenizer):
+        """
+        Parse the next objects with this tokenizer. The parser is reused to
+        avoid an allocation per object.
+        """
         self._tokenizer = tokenizer
         self._it = iter(self._tokenizer)
-        self._cur = []
+        self._stack.clear()
+        self._open_tokens.clear()
 
     def parse(self):
-        stack = []
-        prev_token = None
+        stack = self._stack  # the objects of the open containers
+        open_tokens = self._open_tokens  # the tokens that opened them
+        next_token = self._it.__next__
         while True:
-            if prev_token is None:
-                token = next(self._it)
-            else:
-                token = prev_token
-                prev_token = None
-
-            if token is OpenDictToken:
-                stack.append([token])
-            elif token is CloseDictToken:
-                dict_objs = stack.pop()
-                assert dict_objs[0] is OpenDictToken
-                d = {}
-                for i in range(1, len(dict_objs), 2):
-                    key = checked_cast(NameObject, dict_objs[i])
-                    d[key.bs] = dict_objs[i + 1]
-                obj = DictObject(d)
-                if stack:
-                    stack[-1].append(obj)
-                else:
-                    return obj
-
-            elif token is OpenArrayToken:
-                stack.append([token])
-            elif token is CloseArrayToken:
-                array_objs = stack.pop()
-                assert array_objs[0] is OpenArrayToken, repr(array_objs)
-                obj = ArrayObject(array_objs[1:])
-                if stack:
-                    stack[-1].append(obj)
-                else:
-                    return obj
-
-            elif isinstance(token, (StringObject, NumberObject, NameObject)):
-                if stack:
-                    stack[-1].append(token)
-                else:
-                    return token
-            elif isinstance(token, WordToken):
-                token = cast(WordToken, token)
-                if token.bs == b"true":
-                    obj = BooleanObject(True)
-                elif token.bs == b"true":
-                    obj = BooleanObject(False)
-                elif token.bs == b"null":
-                    obj = NullObject
-                elif token.bs == b"R":
+            token = next_token()
+            token_class = token.__class__
+            if token_class in _VALUE_CLASSES:
+                obj = token
+            elif token_class is WordToken:
+                bs = token.bs
+                if bs == _R:
                     gen_num = stack[-1].pop()
                     obj_num = stack[-1].pop()
                     obj = IndirectRef(obj_num, gen_num)
                 else:
-                    assert False, repr(token)
-                if stack:
-                    stack[-1].append(obj)
-                else:
-                    return obj
+                    obj = _OBJECT_BY_WORD.get(bs)
+                    assert obj is not None, repr(token)
+            elif token is OpenDictToken or token is OpenArrayToken:
+                stack.append([])
+                open_tokens.append(token)
+                continue
+            elif token is CloseDictToken:
+                dict_objs = stack.pop()
+                open_token = open_tokens.pop()
+                assert open_token is OpenDictToken, repr(dict_objs)
+                check(len(dict_objs) % 2 == 0, "Missing dict value: {}",
+                      dict_objs)
+                obj = DictObject(zip(
+                    [checked_cast(NameObject, key).bs
+                     for key in dict_objs[0::2]],
+                    dict_objs[1::2]))
+            elif token is CloseArrayToken:
+                array_objs = stack.pop()
+                open_token = open_tokens.pop()
+                assert open_token is OpenArrayToken, repr(array_objs)
+                obj = ArrayObject(array_objs)
+            else:
+                assert False, "{} {}".format(repr(token), token_class)
+                continue
 
+            if stack:
+                stack[-1].append(obj)
             else:
-                assert False, "{} {} {}".format(repr(token), token.__class__,
-                                                OpenDictToken.__class__)
+                return obj
 
 
 class TextState:
@@ -544,61 +646,50 @@ class TextState:
         self.word_space = 0  # Tw
 
         # 9.4.1 General : three additional parameters
-        self._tm = TextMatrix.identity()  # See BT
-        self._tlm = TextMatrix.identity()  # the line start
+        # The matrices are stored as (a, b, c, d, e, f) tuples
+        self._tm = _IDENTITY  # See BT
+        self._tlm = _IDENTITY  # the line start
         # text rendering matrix is ignored
         self.last_y = None
         self.last_x = None
 
-    @property
-    def tm(self) -> TextMatrix:
-        return self._tm
-
-    @tm.setter
-    def tm(self, tm: TextMatrix):
-        self._logger.debug("> Cur text matrix is: %s", tm)
-        self._tm = tm
-
-    @property
-    def tlm(self) -> TextMatrix:
-        return self._tlm
-
-    @tlm.setter
-    def tlm(self, tlm: TextMatrix):
-        self._logger.debug(">>> Cur text line matrix is: %s", tlm)
-        self._tlm = tlm
-
     @property
     def x(self):
-        return self._tm.e
+        return self._tm[4]
 
     @property
     def y(self):
-        return self._tm.f
+        return self._tm[5]
 
     @property
     def font_size(self):
-        return self._tm.a
+        return self._tm[0]
 
     def shift_left_tm(self, w: float):
-        self.tm.shift(w, 0)
+        a, b, c, d, e, f = self._tm
+        self._tm = (a, b, c, d, e + w * a, f + w * b)
 
     def set_text_matrix(self, tm: TextMatrix):
-        self.tlm = tm
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(">>> Cur text line matrix is: %s", tm)
+        self._tlm = (tm.a, tm.b, tm.c, tm.d, tm.e, tm.f)
         self._update_text_matrix()
 
     def move_new_line(self, tx: float, ty: float):
-        self.tlm.shift(tx, ty)
+        a, b, c, d, e, f = self._tlm
+        self._tlm = (a, b, c, d, e + tx * a + ty * c, f + tx * b + ty * d)
         self._update_text_matrix()
 
     def _update_text_matrix(self):
-        self.tm = self.tlm.clone()
+        self._tm = self._tlm  # tuples are immutable: no copy
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("> Cur text matrix is: %s", self._tm)
 
     def store_xy(self):
-        self.last_x = self.tm.e
-        self.last_y = self.tm.f
+        self.last_x = self._tm[4]
+        self.last_y = self._tm[5]
 
     def store_x(self):
-        self.last_x = self.tm.e
+        self.last_x = self._tm[4]
 
 
@@ -19,19 +19,22 @@ from base import TextMatrix
 
 
 class Operation:
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return "{}({})".format(self.__class__.__name__, ",".join(
-            ["{}={}".format(x, y) for x, y in self.__dict__.items()]))
+            ["{}={}".format(name, getattr(self, name))
+             for name in self.__slots__]))
 
 
 # Table 57 – Graphics State Operators
 
 class SaveCurGraphicsState(Operation):
-    pass
+    __slots__ = ()
 
 
 class RestoreCurGraphicsState(Operation):
-    pass
+    __slots__ = ()
 
 
 class ModifyCTM(Operation):
@@ -41,6 +44,8 @@ class ModifyCTM(Operation):
     y′ = b × x + d × y + f
     """
 
+    __slots__ = ("a", "b", "c", "d", "e", "f")
+
     def __init__(self, a, b, c, d, e, f):
         self.a = a
         self.b = b
@@ -51,42 +56,58 @@ class ModifyCTM(Operation):
 
 
 class SetLineWidth(Operation):
+    __slots__ = ("width",)
+
     def __init__(self, width):
         self.width = width
 
 
 class SetLineCap(Operation):
+    __slots__ = ("cap",)
+
     def __init__(self, cap):
         self.cap = cap
 
 
 class SetLineJoin(Operation):
+    __slots__ = ("join",)
+
     def __init__(self, join):
         self.join = join
 
 
 class SetMiterLimit(Operation):
+    __slots__ = ("miter_limit",)
+
     def __init__(self, miter_limit):
         self.miter_limit = miter_limit
 
 
 class SetLineDashPattern(Operation):
+    __slots__ = ("dash_array", "dash_phase")
+
     def __init__(self, dash_array, dash_phase):
         self.dash_array = dash_array
         self.dash_phase = dash_phase
 
 
 class SetColourRenderingIntent(Operation):
+    __slots__ = ("intent",)
+
     def __init__(self, intent):
         self.intent = intent
 
 
 class SetFlatnessTolerance(Operation):
+    __slots__ = ("flatness",)
+
     def __init__(self, flatness):
         self.flatness = flatness
 
 
 class SetParameters(Operation):
+    __slots__ = ("dict_name",)
+
     def __init__(self, dict_name):
         self.dict_name = dict_name
 
@@ -94,18 +115,24 @@ class SetParameters(Operation):
 # Table 59 – Path Construction Operators
 
 class BeginSubpath(Operation):
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
 
 class AppendStraightLine(Operation):
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
 
 class AppendCubicBezier1(Operation):
+    __slots__ = ("x1", "y1", "x2", "y2", "x3", "y3")
+
     def __init__(self, x1, y1, x2, y2, x3, y3):
         self.x1 = x1
         self.y1 = y1
@@ -116,6 +143,8 @@ class AppendCubicBezier1(Operation):
 
 
 class AppendCubicBezier2(Operation):
+    __slots__ = ("x2", "y2", "x3", "y3")
+
     def __init__(self, x2, y2, x3, y3):
         self.x2 = x2
         self.y2 = y2
@@ -124,6 +153,8 @@ class AppendCubicBezier2(Operation):
 
 
 class AppendCubicBezier3(Operation):
+    __slots__ = ("x1", "y1", "x3", "y3")
+
     def __init__(self, x1, y1, x3, y3):
         self.x1 = x1
         self.y1 = y1
@@ -132,10 +163,12 @@ class AppendCubicBezier3(Operation):
 
 
 class ClosePath(Operation):
-    pass
+    __slots__ = ()
 
 
 class AppendRectangle(Operation):
+    __slots__ = ("x", "y", "w", "h")
+
     def __init__(self, x, y, w, h):
         self.x = x
         self.y = y
@@ -146,11 +179,13 @@ class AppendRectangle(Operation):
 # Table 60 – Path-Painting Operators
 
 class StrokePath(Operation):
-    pass
+    __slots__ = ()
 
 
 #
 class SetFont(Operation):
+    __slots__ = ("name", "size")
+
     def __init__(self, name: bytes, size: float):
         self.name = name
         self.size = size
@@ -164,18 +199,24 @@ class SetTextMatrix(Operation):
     See Table 108 – Text-positioning operators (continued)
     """
 
+    __slots__ = ("tm",)
+
     def __init__(self, tm: TextMatrix):
         self.tm = tm
 
 class UpdateTextMatrix(Operation):
+    __slots__ = ("w",)
+
     def __init__(self, w: float):
         self.w = w
 
 class MoveStartNextLineWoParams(Operation):
-    pass
+    __slots__ = ()
 
 
 class MoveStartNextLine(Operation):
+    __slots__ = ("tx", "ty")
+
     def __init__(self, tx: float, ty: float):
         self.tx = tx
         self.ty = ty
@@ -184,6 +225,8 @@ class MoveStartNextLine(Operation):
 
 # Table 109 – Text-showing operators
 class ShowTextString(Operation):
+    __slots__ = ("bs",)
+
     def __init__(self, bs: bytes):
         self.bs = bs
 
@@ -197,32 +240,42 @@ class ShowTextString(Operation):
 
 # Table 105 – Text state operators
 class SetCharSpacing(Operation):
+    __slots__ = ("char_space",)
+
     def __init__(self, char_space: float):
         self.char_space = char_space
 
 class SetWordSpacing(Operation):
+    __slots__ = ("word_space",)
+
     def __init__(self, word_space: float):
         self.word_space = word_space
 
 class SetTextLeading(Operation):
+     __slots__ = ("leading",)
+
      def __init__(self, leading: float):
          self.leading = leading
 
 class SetTextRise(Operation):
+    __slots__ = ("rise",)
+
     def __init__(self, rise: float):
         self.rise = rise
 
 class SetHorizScaling(Operation):
+    __slots__ = ("scale",)
+
     def __init__(self, scale: float):
         self.scale = scale
 
 
 # Table 107 – Text object operators
 class BeginText(Operation):
-    pass
+    __slots__ = ()
 
 class EndText(Operation):
-    pass
+    __slots__ = ()
 
 __all__ = ['AppendCubicBezier1', 'AppendCubicBezier2', 'AppendCubicBezier3',
            'AppendRectangle', 'AppendStraightLine', 'BeginSubpath', 'BeginText', 'ClosePath', 'EndText',
@@ -232,4 +285,6 @@ __all__ = ['AppendCubicBezier1', 'AppendCubicBezier2', 'AppendCubicBezier3',
            'SaveCurGraphicsState', 'SetColourRenderingIntent',
            'SetFlatnessTolerance', 'SetFont', 'SetLineCap',
            'SetLineDashPattern', 'SetLineJoin', 'SetLineWidth', 'SetMiterLimit',
-           'SetParameters', 'ShowTextString', 'SetTextMatrix', 'UpdateTextMatrix']  # 'TD', 'Td',
+           'SetParameters', 'ShowTextString', 'SetTextMatrix', 'UpdateTextMatrix',
+           'SetCharSpacing', 'SetWordSpacing', 'SetTextRise', 'SetHorizScaling',
+           'StrokePath']  # 'TD', 'Td',
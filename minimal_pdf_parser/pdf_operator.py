@@ -16,6 +16,8 @@
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import logging
+from collections import deque
+from itertools import islice
 from typing import Any, List
 
 from base import checked_cast, NumberObject, StringObject, OpenArrayToken, \
@@ -29,7 +31,7 @@ class TokenQueue:
     _logger = logging.getLogger(__name__)
 
     def __init__(self):
-        self._arr = []
+        self._arr = deque()
 
     def push(self, element: Any):
         self._arr.append(element)
@@ -44,39 +46,83 @@ class TokenQueue:
             self._logger.warning("queue err: %s (empty)", self._arr)
             return None
 
-        return self._arr.pop(0)
+        return self._arr.popleft()
 
     def shift_arr(self) -> List[Any]:
         token = self.shift()
         if token is not OpenArrayToken:
             self._logger.warning("Expected open array, was: %s", token)
-        ret = []
-        token = self.shift()
-        while token and token is not CloseArrayToken:
-            ret.append(token)
-            token = self.shift()
+        arr = self._arr
+        try:
+            idx = arr.index(CloseArrayToken)
+        except ValueError:
+            self._logger.warning("queue err: %s (no close array)", arr)
+            ret = list(arr)
+            arr.clear()
+            return ret
+
+        ret = list(islice(arr, idx))
+        if idx == len(arr) - 1:  # the usual case
+            arr.clear()
+        else:
+            for _ in range(idx + 1):
+                arr.popleft()
         return ret
 
     def shift_n(self, n: int = 1) -> List[Any]:
-        if len(self._arr) == n:
-            ret = self._arr[:]
-        elif len(self._arr) < n:
-            self._logger.warning("queue err: %s (%s)", self._arr, n)
-            ret = self._arr + [None] * (n - len(self._arr))
+        arr = self._arr
+        size = len(arr)
+        if size == n:  # the usual case
+            if n == 1:
+                return [arr.popleft()]
+            ret = list(arr)
+        elif size < n:
+            self._logger.warning("queue err: %s (%s)", arr, n)
+            ret = list(arr) + [None] * (n - size)
         else:  # len(queue: TokenQueue) > n:
-            self._logger.warning("queue err: %s (%s)", self._arr, n)
-            ret = self._arr[:n]
+            self._logger.warning("queue err: %s (%s)", arr, n)
+            ret = list(islice(arr, n))
 
-        assert len(ret) == n
-        self.clear()
+        arr.clear()
         return ret
 
     def clear(self):
         self._arr.clear()
 
 
+def _number_value(token: Any) -> Any:
+    """
+    :param token: a token that should be a number
+    :return: the value of the number
+    """
+    if token.__class__ is NumberObject:
+        return token.value
+    return checked_cast(NumberObject, token).value  # raises an error
+
+
+def _number_values(tokens: List[Any]) -> List[Any]:
+    """
+    :param tokens: tokens that should be numbers
+    :return: the values of the numbers
+    """
+    return [token.value if token.__class__ is NumberObject
+            else checked_cast(NumberObject, token).value
+            for token in tokens]
+
+
+def _string_bytes(token: Any) -> bytes:
+    """
+    :param token: a token that should be a string
+    :return: the bytes of the string
+    """
+    if token.__class__ is StringObject:
+        return token.bs
+    return checked_cast(StringObject, token).bs  # raises an error
+
+
 class Operator:
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         """Ignore operator or override this method !"""
         queue.clear()
         return []
@@ -85,69 +131,79 @@ class Operator:
 # Table 57 – Graphics State Operators
 
 class SaveCurGraphicsStateOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [SaveCurGraphicsState()]
 
 
 class RestoreCurGraphicsStateOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [RestoreCurGraphicsState()]
 
 
 class ModifyCTMOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        a, b, c, d, e, f = [checked_cast(NumberObject, x).value for x in
-                            queue.shift_n(6)]
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        a, b, c, d, e, f = _number_values(queue.shift_n(6))
         return [ModifyCTM(a, b, c, d, e, f)]
 
 
 class SetLineWidthOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        width = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        width = _number_value(queue.shift())
         return [SetLineWidth(width)]
 
 
 class SetLineCapOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        cap = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        cap = _number_value(queue.shift())
         return [SetLineCap(cap)]
 
 
 class SetLineJoinOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         join = queue.shift()
         return [SetLineJoin(join)]
 
 
 class SetMiterLimitOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         miter_limit = queue.shift()
         return [SetMiterLimit(miter_limit)]
 
 
 class SetLineDashPatternOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         dash_array = queue.shift_arr()  # array of numbers
         dash_phase = queue.shift()  # number
         return [SetLineDashPattern(dash_array, dash_phase)]
 
 
 class SetColourRenderingIntentOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         intent = queue.shift()
         return [SetColourRenderingIntent(intent)]
 
 
 class SetFlatnessToleranceOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         flatness = queue.shift()
         return [SetFlatnessTolerance(flatness)]
 
 
 class SetParametersOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         dict_name = queue.shift()
         return [SetParameters(dict_name)]
 
@@ -155,43 +211,50 @@ class SetParametersOperator(Operator):
 # Table 59 – Path Construction Operators
 
 class BeginSubpathOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         x, y = queue.shift_n(2)
         return [BeginSubpath(x, y)]
 
 
 class AppendStraightLineOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         x, y = queue.shift_n(2)
         return [AppendStraightLine(x, y)]
 
 
 class AppendCubicBezier1Operator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         x1, y1, x2, y2, x3, y3 = queue.shift_n(6)
         return [AppendCubicBezier1(x1, y1, x2, y2, x3, y3)]
 
 
 class AppendCubicBezier2Operator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         x2, y2, x3, y3 = queue.shift_n(4)
         return [AppendCubicBezier2(x2, y2, x3, y3)]
 
 
 class AppendCubicBezier3Operator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         x1, y1, x3, y3 = queue.shift_n(4)
         return [AppendCubicBezier3(x1, y1, x3, y3)]
 
 
 class ClosePathOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [ClosePath()]
 
 
 class AppendRectangleOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         x, y, w, h = queue.shift_n(4)
         return [AppendRectangle(x, y, w, h)]
 
@@ -199,13 +262,15 @@ class AppendRectangleOperator(Operator):
 # Table 60 – Path-Painting Operators
 
 class StrokePathOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [StrokePath()]
 
 
 class CloseAndStrokePathOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [ClosePath(), StrokePath()]
 
@@ -252,13 +317,15 @@ class IntersectOEROperator(Operator):
 # Table 107 – Text object operators
 
 class BeginTextOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [BeginText()]
 
 
 class EndTextOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [EndText()]
 
@@ -266,26 +333,29 @@ class EndTextOperator(Operator):
 # Table 108 – Text-positioning operators
 
 class MoveStartNextLineOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        tx, ty = [checked_cast(NumberObject, x).value for x in queue.shift_n(2)]
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        tx, ty = _number_values(queue.shift_n(2))
         return [MoveStartNextLine(tx, ty)]
 
 
 class MoveStartNextLineTextStateOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        tx, ty = [checked_cast(NumberObject, x).value for x in queue.shift_n(2)]
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        tx, ty = _number_values(queue.shift_n(2))
         return [SetTextLeading(-ty), MoveStartNextLine(tx, ty)]
 
 
 class SetTextMatrixOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        a, b, c, d, e, f = [checked_cast(NumberObject, x).value for x in
-                            queue.shift_n(6)]
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        a, b, c, d, e, f = _number_values(queue.shift_n(6))
         return [SetTextMatrix(TextMatrix(a, b, c, d, e, f))]
 
 
 class MoveStartNextLineWoParamsOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         queue.ignore()
         return [MoveStartNextLineWoParams()]
 
@@ -293,25 +363,27 @@ class MoveStartNextLineWoParamsOperator(Operator):
 # Table 109 – Text-showing operators
 
 class ShowTextStringOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        bs = checked_cast(StringObject, queue.shift()).bs
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        bs = _string_bytes(queue.shift())
         return [ShowTextString(bs)]
 
 
 class MoveStartNextLineAndShowTextStringOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        bs = checked_cast(StringObject, queue.shift()).bs
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        bs = _string_bytes(queue.shift())
         return [MoveStartNextLineWoParams(), ShowTextString(bs)]
 
 
 class MoveStartNextLineAndShowTextStringWWordSpacingOperator(Operator):
     """ " """
 
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        aw = checked_cast(NumberObject, queue.shift()).value
-        ac = checked_cast(NumberObject, queue.shift()).value
-        string = checked_cast(StringObject, queue.shift()).bs
-        logging.getLogger().warning("%s, %s", self, queue)
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        aw = _number_value(queue.shift())
+        ac = _number_value(queue.shift())
+        string = _string_bytes(queue.shift())
         return [SetWordSpacing(aw), SetCharSpacing(ac),
                 MoveStartNextLineWoParams(), ShowTextString(string)]
 
@@ -319,16 +391,20 @@ class MoveStartNextLineAndShowTextStringWWordSpacingOperator(Operator):
 class ShowTextStringsOperator(Operator):
     _logger = logging.getLogger(__name__)
 
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         arr = queue.shift_arr()
         ret = []
+        append = ret.append
         for token in arr:
-            if isinstance(token, StringObject):
-                ret.append(ShowTextString(token.bs))
-            elif isinstance(token, NumberObject):
-                ret.append(UpdateTextMatrix(token.value))
+            token_class = token.__class__
+            if token_class is StringObject:
+                append(ShowTextString(token.bs))
+            elif token_class is NumberObject:
+                append(UpdateTextMatrix(token.value))
             else:
-                self._logger.warning("Unexpected TD array token %s", token)
+                ShowTextStringsOperator._logger.warning(
+                    "Unexpected TD array token %s", token)
 
         return ret
 
@@ -454,35 +530,40 @@ class EndCompatibilityOperator(Operator):
 # Table 105 – Text state operators
 
 class SetCharSpacingOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        char_space = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        char_space = _number_value(queue.shift())
         return [SetCharSpacing(char_space)]
 
     pass
 
 
 class SetWordSpacingOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        word_space = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        word_space = _number_value(queue.shift())
         return [SetWordSpacing(word_space)]
 
 
 class SetHorizScalingOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        scale = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        scale = _number_value(queue.shift())
         return [SetHorizScaling(scale)]
 
 
 class SetTextLeadingOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        leading = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        leading = _number_value(queue.shift())
         return [SetTextLeading(leading)]
 
 
 class SetFontOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
         font = checked_cast(NameObject, queue.shift()).bs
-        size = checked_cast(NumberObject, queue.shift()).value
+        size = _number_value(queue.shift())
         return [SetFont(font, size)]
 
 
@@ -491,113 +572,120 @@ class SetTextRenderingModeOperator(Operator):
 
 
 class SetTextRiseOperator(Operator):
-    def build(self, queue: TokenQueue) -> List[Operation]:
-        rise = checked_cast(NumberObject, queue.shift()).value
+    @staticmethod
+    def build(queue: TokenQueue) -> List[Operation]:
+        rise = _number_value(queue.shift())
         return [SetTextRise(rise)]
 
 
 operator_by_token_bytes = {
     # Table 57 – Graphics State Operators
-    b"q": SaveCurGraphicsStateOperator(),
-    b"Q": RestoreCurGraphicsStateOperator(),
-    b"cm": ModifyCTMOperator(),
-    b"w": SetLineWidthOperator(),
-    b"J": SetLineCapOperator(),
-    b"j": SetLineJoinOperator(),
-    b"M": SetMiterLimitOperator(),
-    b"d": SetLineDashPatternOperator(),
-    b"ri": SetColourRenderingIntentOperator(),
-    b"i": SetFlatnessToleranceOperator(),
-    b"gs": SetParametersOperator(),
-
-    b"m": BeginSubpathOperator(),
-    b"l": AppendStraightLineOperator(),
-    b"c": AppendCubicBezier1Operator(),
-    b"v": AppendCubicBezier2Operator(),
-    b"y": AppendCubicBezier3Operator(),
-    b"h": ClosePathOperator(),
-    b"re": AppendRectangleOperator(),
+    b"q": SaveCurGraphicsStateOperator,
+    b"Q": RestoreCurGraphicsStateOperator,
+    b"cm": ModifyCTMOperator,
+    b"w": SetLineWidthOperator,
+    b"J": SetLineCapOperator,
+    b"j": SetLineJoinOperator,
+    b"M": SetMiterLimitOperator,
+    b"d": SetLineDashPatternOperator,
+    b"ri": SetColourRenderingIntentOperator,
+    b"i": SetFlatnessToleranceOperator,
+    b"gs": SetParametersOperator,
+
+    b"m": BeginSubpathOperator,
+    b"l": AppendStraightLineOperator,
+    b"c": AppendCubicBezier1Operator,
+    b"v": AppendCubicBezier2Operator,
+    b"y": AppendCubicBezier3Operator,
+    b"h": ClosePathOperator,
+    b"re": AppendRectangleOperator,
 
     # Table 60 – Path-Painting Operators
-    b"S": StrokePathOperator(),
-    b"s": CloseAndStrokePathOperator(),
-    b"f": FillPathNZWOperator(),
-    b"F": FillPathNZWOperator(),
+    b"S": StrokePathOperator,
+    b"s": CloseAndStrokePathOperator,
+    b"f": FillPathNZWOperator,
+    b"F": FillPathNZWOperator,
     # Equivalent to f; included only for compatibility.
-    b"f*": FillPathOEROperator(),
-    b"B": FillAndStrokePathNZWOperator(),
-    b"B*": FillAndStrokePathOEROperator(),
-    b"b": CloseFillAndStrokePathNZWOperator(),
-    b"b*": CloseFillAndStrokePathOEROperator(),
-    b"n": EndPathOperator(),
+    b"f*": FillPathOEROperator,
+    b"B": FillAndStrokePathNZWOperator,
+    b"B*": FillAndStrokePathOEROperator,
+    b"b": CloseFillAndStrokePathNZWOperator,
+    b"b*": CloseFillAndStrokePathOEROperator,
+    b"n": EndPathOperator,
 
     # Table 61 – Clipping Path Operators
-    b"W": IntersectNZWOperator(),
-    b"W*": IntersectOEROperator(),
+    b"W": IntersectNZWOperator,
+    b"W*": IntersectOEROperator,
 
     # Table 107 – Text object operators
-    b"BT": BeginTextOperator(),
-    b"ET": EndTextOperator(),
+    b"BT": BeginTextOperator,
+    b"ET": EndTextOperator,
 
     # Table 108 – Text-positioning operators
-    b"Td": MoveStartNextLineOperator(),
-    b"TD": MoveStartNextLineTextStateOperator(),
-    b"Tm": SetTextMatrixOperator(),
-    b"T*": MoveStartNextLineWoParamsOperator(),
+    b"Td": MoveStartNextLineOperator,
+    b"TD": MoveStartNextLineTextStateOperator,
+    b"Tm": SetTextMatrixOperator,
+    b"T*": MoveStartNextLineWoParamsOperator,
 
     # Table 109 – Text-showing operators
-    b"Tj": ShowTextStringOperator(),
-    b"'": MoveStartNextLineAndShowTextStringOperator(),
-    b"\"": MoveStartNextLineAndShowTextStringWWordSpacingOperator(),
-    b"TJ": ShowTextStringsOperator(),
+    b"Tj": ShowTextStringOperator,
+    b"'": MoveStartNextLineAndShowTextStringOperator,
+    b"\"": MoveStartNextLineAndShowTextStringWWordSpacingOperator,
+    b"TJ": ShowTextStringsOperator,
 
     # Table 113 – Type 3 font operators
-    b"d0": SetGlyphWidthOperator(),
-    b"d1": SetGlyphBBOperator(),
+    b"d0": SetGlyphWidthOperator,
+    b"d1": SetGlyphBBOperator,
 
     # Table 74 – Colour Operators
-    b"CS": SetCurColourSpace1Operator(),
-    b"cs": SetCurColourSpace1NonStrokingOperator(),
-    b"SC": SetCurColourSpace2Operator(),
-    b"SCN": SetCurColourSpace3Operator(),
-    b"sc": SetCurColourSpace2NonStrokingOperator(),
-    b"scn": SetCurColourSpace3NonStrokingOperator(),
-    b"G": SetStrokingColourSpaceToGrayOperator(),
-    b"g": SetStrokingColourSpaceToGrayNonStrokingOperator(),
-    b"RG": SetStrokingColourSpaceToRGBOperator(),
-    b"rg": SetStrokingColourSpaceToRGBNonStrokingOperator(),
-    b"K": SetStrokingColourSpaceToCMYKOperator(),
-    b"k": SetStrokingColourSpaceToCMYKNonStrokingOperator(),
+    b"CS": SetCurColourSpace1Operator,
+    b"cs": SetCurColourSpace1NonStrokingOperator,
+    b"SC": SetCurColourSpace2Operator,
+    b"SCN": SetCurColourSpace3Operator,
+    b"sc": SetCurColourSpace2NonStrokingOperator,
+    b"scn": SetCurColourSpace3NonStrokingOperator,
+    b"G": SetStrokingColourSpaceToGrayOperator,
+    b"g": SetStrokingColourSpaceToGrayNonStrokingOperator,
+    b"RG": SetStrokingColourSpaceToRGBOperator,
+    b"rg": SetStrokingColourSpaceToRGBNonStrokingOperator,
+    b"K": SetStrokingColourSpaceToCMYKOperator,
+    b"k": SetStrokingColourSpaceToCMYKNonStrokingOperator,
 
     # Table 77 – Shading Operator
-    b"sh": PaintShapeOperator(),
+    b"sh": PaintShapeOperator,
 
     # Table 92 – Inline Image Operators
-    b"BI": BeginInlineImageOperator(),
-    b"ID": BeginInlineImageDataOperator(),
-    b"EI": EndInlineImageOperator(),
+    b"BI": BeginInlineImageOperator,
+    b"ID": BeginInlineImageDataOperator,
+    b"EI": EndInlineImageOperator,
 
     # Table 87 – XObject Operator
-    b"Do": PaintXObjectOperator(),
+    b"Do": PaintXObjectOperator,
 
     # Table 320 – Marked-content operators
-    b"MP": MarkedContentOperator(),
-    b"DP": MarkedContentWListOperator(),
-    b"BMC": BeginMarkedContentOperator(),
-    b"BDC": BeginMarkedContentWPropertiesOperator(),
-    b"EMC": EndMarkedContentOperator(),
+    b"MP": MarkedContentOperator,
+    b"DP": MarkedContentWListOperator,
+    b"BMC": BeginMarkedContentOperator,
+    b"BDC": BeginMarkedContentWPropertiesOperator,
+    b"EMC": EndMarkedContentOperator,
 
     # Table 32 – Compatibility operators
-    b"BX": BeginCompatibilityOperator(),
-    b"EX": EndCompatibilityOperator(),
+    b"BX": BeginCompatibilityOperator,
+    b"EX": EndCompatibilityOperator,
 
     ################################################
     # Table 105 – Text state operators
-    b"Tc": SetCharSpacingOperator(),
-    b"Tw": SetWordSpacingOperator(),
-    b"Tz": SetHorizScalingOperator(),
-    b"TL": SetTextLeadingOperator(),
-    b"Tf": SetFontOperator(),
-    b"Tr": SetTextRenderingModeOperator(),
-    b"Ts": SetTextRiseOperator(),
+    b"Tc": SetCharSpacingOperator,
+    b"Tw": SetWordSpacingOperator,
+    b"Tz": SetHorizScalingOperator,
+    b"TL": SetTextLeadingOperator,
+    b"Tf": SetFontOperator,
+    b"Tr": SetTextRenderingModeOperator,
+    b"Ts": SetTextRiseOperator,
+}
+
+# The `build` functions, to skip the attribute lookup on each operator
+build_by_token_bytes = {
+    token_bytes: operator_class.build
+    for token_bytes, operator_class in operator_by_token_bytes.items()
 }
@@ -17,9 +17,14 @@
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import struct
 from hashlib import md5
-from typing import List, BinaryIO
+from typing import BinaryIO, Sequence
 
-from tokenizer import _bytes_to_string
+try:
+    from Crypto.Cipher import ARC4 as _ARC4_cipher
+except ImportError:  # PyCryptodome is optional: fall back to pure Python
+    _ARC4_cipher = None
+
+ARC4_STREAM_BUF_SIZE = 1 << 16
 
 PADDING_STRING = (b"\x28\xbf\x4e\x5e\x4e\x75\x8a\x41"
                   b"\x64\x00\x4e\x56\xff\xfa\x01\x08"
@@ -33,6 +38,7 @@ class Encrypter:
         self.encryption_key = encryption_key
         self.version = version
         self.aes = aes
+        self._key_by_ref = {}
 
     def encrypt_data(self, obj_num: int, gen_num: int, data: bytes):
         """
@@ -78,6 +84,14 @@ class Encrypter:
         return ARC4_stream(key, s, d)
 
     def get_rc4_key(self, obj_num: int, gen_num: int) -> bytes:
+        ref = (obj_num, gen_num)
+        key = self._key_by_ref.get(ref)
+        if key is None:
+            key = self._key_by_ref[ref] = self._compute_rc4_key(obj_num,
+                                                                gen_num)
+        return key
+
+    def _compute_rc4_key(self, obj_num: int, gen_num: int) -> bytes:
         # a)Obtain the obj number and generation number from the obj identifier of the string or stream to be
         # encrypted (see 7.3.10, "Indirect Objects"). If the string is a direct obj, use the identifier of the indirect
         # obj containing it.
@@ -86,14 +100,13 @@ class Encrypter:
         # bytes of the obj number and the low-order 2 bytes of the generation number in that order, low-order byte
         # first. (n is 5 unless the value of V in the encryption dictionary is greater than 1, in which case n is the value
         # of Length divided by 8.)
-        obj_num_bytes = struct.pack("<i", obj_num)[:3]
-        gen_num_bytes = struct.pack("<i", gen_num)[:2]
-        key = self.encryption_key + obj_num_bytes + gen_num_bytes
+        obj_num_bytes = (obj_num & 0xFFFFFF).to_bytes(3, "little")
+        gen_num_bytes = (gen_num & 0xFFFF).to_bytes(2, "little")
         # If using the AES algorithm, extend the encryption key an additional 4 bytes by adding the value “sAlT”,
         # which corresponds to the hexadecimal values 0x73, 0x41, 0x6C, 0x54. (This addition is done for backward
         # compatibility and is not intended to provide additional security.)
-        if self.aes:
-            key += b"\x73\x41\x6C\x54"
+        salt = b"\x73\x41\x6C\x54" if self.aes else b""
+        key = b"".join([self.encryption_key, obj_num_bytes, gen_num_bytes, salt])
         # c)Initialize the MD5 hash function and pass the result of step (b) as input to this function.
         hasher = md5(key)
         # d)Use the first (n + 5) bytes, up to a maximum of 16, of the output from the MD5 hash as the key for the RC4
@@ -109,9 +122,9 @@ class StandardEncrypterFactory:
     """
     A translation from /Filter obj
     """
-    def __init__(self, doc_id: List[bytes], version: int, revision_num: int,
+    def __init__(self, doc_id: Sequence[bytes], version: int, revision_num: int,
                  length, permissions: int, hashed_owner_and_user_passwd: bytes,
-                 hashed_user_passwd: bytes):
+                 hashed_user_passwd: bytes, encrypt_metadata: bool = True):
         self.doc_id = doc_id
         self.version = version
         self.revision_num = revision_num
@@ -119,6 +132,32 @@ class StandardEncrypterFactory:
         self.permissions = permissions
         self.hashed_owner_and_user_passwd = hashed_owner_and_user_passwd
         self.hashed_user_passwd = hashed_user_passwd
+        self.encrypt_metadata = encrypt_metadata
+        self._hash_suffix = None
+
+    def _get_hash_suffix(self) -> bytes:
+        """
+        Steps c) to f) of Algorithm 2 don't depend on the password: their
+        input is built once for all calls to `create`.
+        """
+        if self._hash_suffix is None:
+            # c)Pass the value of the encryption dictionary’s O entry to the MD5 hash function. ("Algorithm 3: Computing
+            # the encryption dictionary’s O (owner password) value" shows how the O value is computed.)
+            # d)Convert the integer value of the P entry to a 32-bit unsigned binary number and pass these bytes to the
+            # MD5 hash function, low-order byte first.
+            f = struct.pack("<i", self.permissions)
+            # e)Pass the first element of the file’s file identifier array (the value of the ID entry in the self’s
+            # trailer dictionary; see Table 15) to the MD5 hash function.
+            # f)(Security handlers of revision 4 or greater) If self metadata is not being encrypted, pass 4 bytes
+            # with the value 0xFFFFFFFF to the MD5 hash function.
+            if self.revision_num >= 4 and not self.encrypt_metadata:
+                metadata_flag = b"\xff\xff\xff\xff"
+            else:
+                metadata_flag = b""
+            self._hash_suffix = b"".join(
+                [self.hashed_owner_and_user_passwd, f, self.doc_id[0],
+                 metadata_flag])
+        return self._hash_suffix
 
     def create(self, password=b"") -> Encrypter:
         """
@@ -135,37 +174,30 @@ class StandardEncrypterFactory:
         bs = (password + PADDING_STRING)[:32]
         # b)Initialize the MD5 hash function and pass the result of step (a) as input to this function.
         hasher = md5(bs)
-        # c)Pass the value of the encryption dictionary’s O entry to the MD5 hash function. ("Algorithm 3: Computing
-        # the encryption dictionary’s O (owner password) value" shows how the O value is computed.)
-        hasher.update(self.hashed_owner_and_user_passwd)
-        # d)Convert the integer value of the P entry to a 32-bit unsigned binary number and pass these bytes to the
-        # MD5 hash function, low-order byte first.
-        f = struct.pack("<i", self.permissions)
-        hasher.update(f)
-        # e)Pass the first element of the file’s file identifier array (the value of the ID entry in the self’s trailer
-        # dictionary; see Table 15) to the MD5 hash function.
-        hasher.update(self.doc_id[0])
-        # f)(Security handlers of revision 4 or greater) If self metadata is not being encrypted, pass 4 bytes with
-        # the value 0xFFFFFFFF to the MD5 hash function.
-        if self.revision_num >= 4:
-            hasher.update(b"0xff0xff0xff0xff")
+        # c), d), e) and f): see _get_hash_suffix
+        hasher.update(self._get_hash_suffix())
         # g)Finish the hash.
         digest = hasher.digest()
         # h)(Security handlers of revision 3 or greater) Do the following 50 times: Take the output from the previous
         # MD5 hash and pass the first n bytes of the output as input into a new MD5 hash, where n is the number of
         # bytes of the encryption key as defined by the value of the encryption dictionary’s Length entry.
-        if self.revision_num >= 3:
+        # (see i) for n)
+        if self.revision_num == 2:
+            length = 5
+        else:
             length = self.length // 8
-            for _ in range(50):
-                digest = md5(digest[:length]).digest()
+        if self.revision_num >= 3:
+            new_md5 = md5
+            if length >= 16:  # the whole digest: no slice to copy
+                for _ in range(50):
+                    digest = new_md5(digest).digest()
+            else:
+                for _ in range(50):
+                    digest = new_md5(digest[:length]).digest()
 
         # i)Set the encryption key to the first n bytes of the output from the final MD5 hash, where n shall always be 5
         # for security handlers of revision 2 but, for security handlers of revision 3 or greater, shall depend on the
         # value of the encryption dictionary’s Length entry.
-        if self.revision_num == 2:
-            length = 5
-        else:
-            length = self.length // 8
         encryption_key = digest[:length]
         return Encrypter(encryption_key, self.version)
 
@@ -179,19 +211,11 @@ def ARC4_stream(key: bytes, s: BinaryIO, d: BinaryIO):
     :param d:
     :return:
     """
-    permutation = _init_ARC4(key)
-
-    i = 0
-    j = 0
-    bytes_read = s.read(1)
-    while bytes_read != b'':
-        b = bytes_read[0]
-        i = (i + 1) & 0xFF
-        j = (j + permutation[i]) & 0xFF
-        permutation[i], permutation[j] = permutation[j], permutation[i]
-        cipher_byte = permutation[(permutation[i] + permutation[j]) & 0xFF]
-        d.write(struct.pack("B", b ^ cipher_byte))
-        bytes_read = s.read(1)
+    it = ARC4_iterator(key)
+    bytes_read = s.read(ARC4_STREAM_BUF_SIZE)
+    while bytes_read:
+        d.write(it.chunk(bytes_read))
+        bytes_read = s.read(ARC4_STREAM_BUF_SIZE)
 
 
 def ARC4(key: bytes, data: bytes) -> bytes:
@@ -201,19 +225,7 @@ def ARC4(key: bytes, data: bytes) -> bytes:
     :param data:
     :return:
     """
-    permutation = _init_ARC4(key)
-
-    ret = []
-    i = 0
-    j = 0
-    for b in data:
-        i = (i + 1) & 0xFF
-        j = (j + permutation[i]) & 0xFF
-        permutation[i], permutation[j] = permutation[j], permutation[i]
-        cipher_byte = permutation[(permutation[i] + permutation[j]) & 0xFF]
-        ret.append(b ^ cipher_byte)
-
-    return _bytes_to_string(ret)
+    return ARC4_iterator(key).chunk(data)
 
 
 class ARC4_iterator:
@@ -225,30 +237,56 @@ class ARC4_iterator:
     """
 
     def __init__(self, key: bytes):
-        self.permutation = _init_ARC4(key)
+        self._cipher = _new_ARC4_cipher(key)
+        if self._cipher is None:
+            self.permutation = _init_ARC4(key)
         self.i = 0
         self.j = 0
 
     def chunk(self, data: bytes) -> bytes:
-        ret = []
-        for b in data:
-            self.i = (self.i + 1) & 0xFF
-            self.j = (self.j + self.permutation[self.i]) & 0xFF
-            self.permutation[self.i], self.permutation[self.j] = self.permutation[
-                                                                      self.j], self.permutation[
-                self.i]
-            cipher_byte = self.permutation[
-                (self.permutation[self.i] + self.permutation[self.j]) & 0xFF]
-            ret.append(b ^ cipher_byte)
-
-        return _bytes_to_string(ret)
-
-
-def _init_ARC4(key: bytes):
-    permutation = list(range(256))
-    len_key = len(key)
+        if self._cipher is not None:
+            return self._cipher.encrypt(data)
+
+        permutation = self.permutation
+        i = self.i
+        j = self.j
+        n = len(data)
+        key_stream = bytearray(n)
+        for k in range(n):
+            i = (i + 1) & 0xFF
+            p_i = permutation[i]
+            j = (j + p_i) & 0xFF
+            p_j = permutation[j]
+            permutation[i] = p_j
+            permutation[j] = p_i
+            key_stream[k] = permutation[(p_i + p_j) & 0xFF]
+        self.i = i
+        self.j = j
+
+        # a single XOR of the whole block, done by int
+        return (int.from_bytes(data, "little")
+                ^ int.from_bytes(key_stream, "little")).to_bytes(n, "little")
+
+
+def _new_ARC4_cipher(key: bytes):
+    """
+    :return: a C RC4 cipher if PyCryptodome is available, None otherwise
+    """
+    if _ARC4_cipher is None:
+        return None
+    try:
+        return _ARC4_cipher.new(key)
+    except ValueError:  # key length out of range
+        return None
+
+
+def _init_ARC4(key: bytes) -> bytearray:
+    permutation = bytearray(range(256))
+    key_stream = (key * (256 // len(key) + 1))[:256]
     j = 0
-    for i in range(256):
-        j = (j + permutation[i] + key[i % len_key]) & 0xFF
-        permutation[i], permutation[j] = permutation[j], permutation[i]
+    for i, k in enumerate(key_stream):
+        p_i = permutation[i]
+        j = (j + p_i + k) & 0xFF
+        permutation[i] = permutation[j]
+        permutation[j] = p_i
     return permutation
@@ -15,61 +15,99 @@
 #
 #     You should have received a copy of the GNU General Public License
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
-import struct
+import binascii
+import io
+import mmap
+import re
 from abc import ABC, abstractmethod
-from typing import NamedTuple, BinaryIO, cast, Any, Iterator
+from itertools import product
+from typing import (
+    NamedTuple, BinaryIO, cast, Any, Dict, Iterator, List, Optional, Tuple)
 
 from base import (
     OpenDictToken, CloseDictToken, OpenArrayToken, CloseArrayToken,
     StringObject, NameObject, WordToken, NumberObject)
 
+BINARY_STREAM_BUF_SIZE = 1 << 12
+
 
 class TokenError(Exception):
     pass
 
 
 class StreamWrapper(ABC):
-    def __init__(self):
-        self._prev = -1
-        self._unget = False
-
+    """
+    An iterator over the bytes of a stream. The wrappers keep a position in
+    their current block: `unget` moves this position back one byte.
+    """
     def __iter__(self):
         return self
 
+    @abstractmethod
     def __next__(self) -> int:
-        if self._unget:
-            self._unget = False
-            return self._prev
-
-        p = self._get()
-        self._prev = p
-        return self._prev
+        pass
 
     @abstractmethod
-    def _get(self) -> int:
+    def unget(self):
         pass
 
-    def unget(self):
-        if self._prev == -1 or self._unget:
-            return
-        self._unget = True
+    def release(self):
+        """
+        Give back the bytes that were read ahead to the underlying stream, if
+        any.
+        """
+        pass
 
 
 class BinaryStreamWrapper(StreamWrapper):
-    def __init__(self, stream: BinaryIO):
-        StreamWrapper.__init__(self)
+    """
+    The stream is read by blocks into a buffer: call `release` to move the
+    stream back to the bytes that were not used.
+    """
+    def __init__(self, stream: BinaryIO,
+                 buf_size: int = BINARY_STREAM_BUF_SIZE):
         self._stream = stream
+        # the first byte is the last byte of the previous block, for `unget`
+        self._buf = bytearray(buf_size + 1)
+        self._block = memoryview(self._buf)[1:]
+        self._pos = 0
+        self._end = 0
+        self._unget_end = 0
 
-    def _get(self) -> int:
-        bytes_read = self._stream.read(1)
-        if not bytes_read:
+    def __next__(self) -> int:
+        pos = self._pos
+        if pos >= self._end:
+            pos = self._fill()
+        self._pos = pos + 1
+        return self._buf[pos]
+
+    def _fill(self) -> int:
+        """
+        :return: the position of the first byte of the new block
+        """
+        buf = self._buf
+        end = self._end
+        if end:
+            buf[0] = buf[end - 1]
+        n = self._stream.readinto(self._block)
+        if not n:
             raise StopIteration()
+        self._end = n + 1
+        self._unget_end = 0
+        return 1
 
-        return bytes_read[0]
-
+    def unget(self):
+        pos = self._pos
+        if pos:
+            self._unget_end = pos
+            self._pos = pos - 1
 
-def _bytes_to_string(cs):
-    return struct.pack("{}B".format(len(cs)), *cs)
+    def release(self):
+        # the byte given back by `unget` was read from the stream.
+        unused = self._end - max(self._pos, self._unget_end)
+        if unused:
+            self._stream.seek(-unused, io.SEEK_CUR)
+            self._end -= unused
 
 
 DELIMITERS = b"()<>[]{}/%"
@@ -101,6 +139,53 @@ R_LOWER = 0x72
 T_LOWER = 0x74
 Z_LOWER = 0x7A
 STAR = 0x2A
+DIGITS = b"0123456789"
+HEX_DIGITS = b"0123456789ABCDEFabcdef"
+
+
+def _byte_class(bs: bytes) -> bytes:
+    """
+    :return: a table indexed by byte: 1 if the byte is in bs, else 0
+    """
+    return bytes(c in bs for c in range(256))
+
+
+# character classes
+_IS_NAME_END = _byte_class(DELIMITERS + WHITESPACES)
+_IS_DIGIT = _byte_class(DIGITS)
+_IS_HEX_DIGIT = _byte_class(HEX_DIGITS)
+_IS_WHITESPACE = _byte_class(WHITESPACES)
+_IS_STRING_SPECIAL = _byte_class(b"()\\")
+_IS_WORD_CHAR = _byte_class(
+    bytes(range(A_UPPER, Z_UPPER + 1)) + bytes(range(A_LOWER, Z_LOWER + 1))
+    + b"*")
+
+# 7.3.4.2 Literal Strings, Table 3 – Escape sequences in literal strings:
+# the byte of a one char escape sequence, None for the other sequences.
+_ESCAPED_BYTE = cast(List[Optional[int]], [None] * 256)
+_ESCAPED_BYTE[N_LOWER] = LINE_FEED
+_ESCAPED_BYTE[R_LOWER] = CARRIAGE_RETURN
+_ESCAPED_BYTE[T_LOWER] = HORIZONTAL_TAB
+_ESCAPED_BYTE[B_LOWER] = BACKSPACE
+_ESCAPED_BYTE[F_LOWER] = FORM_FEED
+_ESCAPED_BYTE[LEFT_PARENTHESIS] = LEFT_PARENTHESIS
+_ESCAPED_BYTE[RIGHT_PARENTHESIS] = RIGHT_PARENTHESIS
+_ESCAPED_BYTE[BACKSLASH] = BACKSLASH
+
+# The name objects are shared: a document uses a few names (the keys of the
+# dicts) many times. The size is bounded for documents with many names.
+MAX_SHARED_NAMES = 4096
+_NAME_BY_BYTES = cast(Dict[bytes, NameObject], {})
+
+
+def _get_name(bs: bytes) -> NameObject:
+    name = _NAME_BY_BYTES.get(bs)
+    if name is None:
+        name = NameObject(bs)
+        if len(_NAME_BY_BYTES) < MAX_SHARED_NAMES:
+            _NAME_BY_BYTES[bs] = name
+    return name
+
 
 # Tokens and objects
 
@@ -119,49 +204,36 @@ class State(ABC):
 
 class StartState(State):
     def handle(self, tokenizer: "PDFTokenizer", c: int):
-        if c == SLASH:  # 3.2.4 Name Object
-            tokenizer.set_state(NameObjectState())
-        elif c == LESS_THAN:  # dict or hex string
-            tokenizer.set_state(OpenDictOrHexStringState())
-        elif c == GREATER_THAN:  # dict or hex string
-            tokenizer.set_state(CloseDictState())
-        elif c == LEFT_SQUARE_BRACKET:  # array
-            return OpenArrayToken
-        elif c == RIGHT_SQUARE_BRACKET:  # array
-            return CloseArrayToken
-        elif c == LEFT_PARENTHESIS:  # string
-            tokenizer.set_state(StringState())
-        elif c == PERCENT_SIGN:  # comment
-            tokenizer.set_state(CommentState())
-        elif c in b"+-.0123456789":
-            tokenizer.set_state(DigitState(c))
-        elif c in b" \r\n":
-            pass
-        else:
-            tokenizer.set_state(WordState(c))
+        state_class = _STATE_CLASS_BY_FIRST_BYTE[c]
+        if state_class is None:  # an array delimiter or a skipped byte
+            return _TOKEN_BY_FIRST_BYTE[c]
+        tokenizer.set_state(state_class(c))
 
 
 class NameObjectState(State):
-    def __init__(self):
-        self._cs = [SLASH]
+    def __init__(self, c):
+        self._cs = bytearray((c,))
 
     def handle(self, tokenizer: "PDFTokenizer", c: int):
         # TODO: hash
-        if c in DELIMITERS or c in WHITESPACES:
-            ret = struct.pack("{}B".format(len(self._cs)), *self._cs)
+        if _IS_NAME_END[c]:
+            ret = bytes(self._cs)
             tokenizer.unget()
             tokenizer.set_state(StartState())
-            return NameObject(ret)
+            return _get_name(ret)
         else:
             self._cs.append(c)
 
 
 class OpenDictOrHexStringState(State):
+    def __init__(self, _c):
+        pass
+
     def handle(self, tokenizer: "PDFTokenizer", c: int):
         if c == LESS_THAN:
             tokenizer.set_state(StartState())
             return OpenDictToken
-        elif c in b"0123456789ABCDEFabcdef":  # 3.2.3 StringObject Objects
+        elif _IS_HEX_DIGIT[c] or _IS_WHITESPACE[c]:  # 7.3.4.3
             tokenizer.set_state(HexStringState(c))
         elif c == GREATER_THAN:
             ret = b""
@@ -172,6 +244,9 @@ class OpenDictOrHexStringState(State):
 
 
 class CloseDictState(State):
+    def __init__(self, _c):
+        pass
+
     def handle(self, tokenizer: "PDFTokenizer", c: int):
         if c == GREATER_THAN:
             tokenizer.set_state(StartState())
@@ -181,84 +256,62 @@ class CloseDictState(State):
 
 
 class StringState(State):
-    def __init__(self):
-        self._cs = []
+    def __init__(self, _c):
+        self._cs = bytearray()
         self._esc = False
         self._esc_cr = False
         self._lparen_count = 0
-        self._ddd = None
+        # \ddd: the value and the number of digits read
+        self._ddd = 0
+        self._ddd_len = 0
 
     def handle(self, tokenizer: "PDFTokenizer", c: int):
-        # TODO \ddd
-        if self._ddd:
-            if len(self._ddd) == 1:
-                if ZERO_DIGIT <= c <= NINE_DIGIT:
-                    self._ddd.append(c - ZERO_DIGIT)
-                else:
-                    self._cs.append(self._ddd[0])
-                    self._ddd = None
-                    tokenizer.unget()
-            elif len(self._ddd) == 2:
-                if ZERO_DIGIT <= c <= NINE_DIGIT:
-                    self._ddd.append(c - ZERO_DIGIT)
-                else:
-                    self._cs.append(self._ddd[0] * 8 + self._ddd[1])
-                    self._ddd = None
-                    tokenizer.unget()
-            elif len(self._ddd) == 3:
-                self._cs.append(
-                    self._ddd[0] * 64 + self._ddd[1] * 8 + self._ddd[2])
-                self._ddd = None
+        ddd_len = self._ddd_len
+        if ddd_len:
+            if ddd_len < 3 and _IS_DIGIT[c]:
+                self._ddd = self._ddd * 8 + c - ZERO_DIGIT
+                self._ddd_len = ddd_len + 1
+            else:
+                # 7.3.4.2: high-order overflow shall be ignored
+                self._cs.append(self._ddd & 0xFF)
+                self._ddd_len = 0
                 tokenizer.unget()
             ret = False
         elif self._esc:
             self._handle_esc(c)
             ret = False
-        elif self._esc_cr:
-            if c == LINE_FEED:
-                self._esc_cr = False
-                ret = False
-            else:
-                ret = self._handle_char(c)
+        elif self._esc_cr:  # a LF after an escaped CR is ignored too
+            self._esc_cr = False
+            ret = c != LINE_FEED and self._handle_char(c)
         else:
             ret = self._handle_char(c)
 
         if ret:
             tokenizer.set_state(StartState())
-            return StringObject(_bytes_to_string(self._cs))
+            return StringObject(bytes(self._cs))
         else:
             return None
 
     def _handle_esc(self, c):
-        if c == B_LOWER:
-            self._cs.append(BACKSPACE)
-        elif c == F_LOWER:
-            self._cs.append(FORM_FEED)
-        elif c == N_LOWER:
-            self._cs.append(LINE_FEED)
-        elif c == R_LOWER:
-            self._cs.append(CARRIAGE_RETURN)
-        elif c == T_LOWER:
-            self._cs.append(HORIZONTAL_TAB)
-        elif c == LEFT_PARENTHESIS:
-            self._cs.append(LEFT_PARENTHESIS)
-        elif c == RIGHT_PARENTHESIS:
-            self._cs.append(RIGHT_PARENTHESIS)
-        elif c == BACKSLASH:
-            self._cs.append(BACKSLASH)
+        escaped = _ESCAPED_BYTE[c]
+        if escaped is not None:
+            self._cs.append(escaped)
         elif c == CARRIAGE_RETURN:
             self._esc_cr = True
         elif c == LINE_FEED:
             pass
-        elif ZERO_DIGIT <= c <= NINE_DIGIT:
-            self._ddd = [c - ZERO_DIGIT]
+        elif _IS_DIGIT[c]:
+            self._ddd = c - ZERO_DIGIT
+            self._ddd_len = 1
         else:
             self._cs.append(BACKSLASH)
             self._cs.append(c)
         self._esc = False
 
     def _handle_char(self, c: int) -> bool:
-        if c == LEFT_PARENTHESIS:
+        if not _IS_STRING_SPECIAL[c]:
+            self._cs.append(c)
+        elif c == LEFT_PARENTHESIS:
             self._lparen_count += 1
             self._cs.append(c)
         elif c == RIGHT_PARENTHESIS:
@@ -267,15 +320,13 @@ class StringState(State):
                 return True
             else:
                 self._cs.append(c)
-        elif c == BACKSLASH:
+        else:  # BACKSLASH
             self._esc = True
-        else:
-            self._cs.append(c)
         return False
 
 
 class CommentState(State):
-    def __init__(self):
+    def __init__(self, _c):
         self._cr = False
 
     def handle(self, tokenizer: "PDFTokenizer", c: int):
@@ -290,63 +341,92 @@ class CommentState(State):
 
 class DigitState(State):
     def __init__(self, c):
-        self._cs = [c]
+        self._cs = bytearray((c,))
         self._dot = c == DOT
 
     def handle(self, tokenizer: "PDFTokenizer", c: int):
         if c == DOT:
             if self._dot:
                 tokenizer.set_state(DigitState(c))
-                return NumberObject(_bytes_to_string(self._cs))
+                return NumberObject(bytes(self._cs), True)
             else:
                 self._dot = True
                 self._cs.append(c)
-        elif c in b"0123456789":
+        elif _IS_DIGIT[c]:
             self._cs.append(c)
         else:
             tokenizer.unget()
             tokenizer.set_state(StartState())
-            return NumberObject(_bytes_to_string(self._cs))
+            return NumberObject(bytes(self._cs), self._dot)
 
 
 class WordState(State):
     def __init__(self, c):
-        self._cs = [c]
+        self._cs = bytearray((c,))
 
     def handle(self, tokenizer: "PDFTokenizer", c: int):
-        if A_LOWER <= c <= Z_LOWER or A_UPPER <= c <= Z_UPPER or c == STAR:
+        if _IS_WORD_CHAR[c]:
             self._cs.append(c)
         else:
             tokenizer.unget()
             tokenizer.set_state(StartState())
-            return WordToken(_bytes_to_string(self._cs))
+            return WordToken(bytes(self._cs))
 
 
 class HexStringState(State):
+    """7.3.4.3 Hexadecimal Strings"""
     def __init__(self, c):
-        self._cs = [c]
+        # c is the first hex digit or a white-space
+        self._cs = bytearray((c,) if _IS_HEX_DIGIT[c] else ())
 
     def handle(self, tokenizer: "PDFTokenizer", c: int):
-        if c in b"0123456789ABCDEFabcdef":  # 3.2.3 StringObject Objects
+        if _IS_HEX_DIGIT[c]:
             self._cs.append(c)
         elif c == GREATER_THAN:
-            hex_string = _bytes_to_string(self._cs)
+            # If the final digit is missing, it shall be assumed to be 0
             if len(self._cs) % 2 == 1:
-                hex_string += b"0"
-            ret = bytes.fromhex(hex_string.decode("ascii"))
+                self._cs.append(ZERO_DIGIT)
             tokenizer.set_state(StartState())
-            return StringObject(ret)
-        else:
+            return StringObject(binascii.unhexlify(self._cs))
+        elif not _IS_WHITESPACE[c]:  # white-space shall be ignored
             raise TokenError()
 
 
+# The states are created with the first byte of the token. A None state is
+# an array delimiter token or a skipped byte.
+_STATE_CLASS_BY_FIRST_BYTE = [WordState] * 256
+_TOKEN_BY_FIRST_BYTE = [None] * 256
+for _c in b"+-." + DIGITS:
+    _STATE_CLASS_BY_FIRST_BYTE[_c] = DigitState
+for _c in b" \r\n":
+    _STATE_CLASS_BY_FIRST_BYTE[_c] = None
+_STATE_CLASS_BY_FIRST_BYTE[SLASH] = NameObjectState  # 3.2.4 Name Object
+_STATE_CLASS_BY_FIRST_BYTE[LESS_THAN] = OpenDictOrHexStringState
+_STATE_CLASS_BY_FIRST_BYTE[GREATER_THAN] = CloseDictState
+_STATE_CLASS_BY_FIRST_BYTE[LEFT_PARENTHESIS] = StringState
+_STATE_CLASS_BY_FIRST_BYTE[PERCENT_SIGN] = CommentState
+_STATE_CLASS_BY_FIRST_BYTE[LEFT_SQUARE_BRACKET] = None
+_TOKEN_BY_FIRST_BYTE[LEFT_SQUARE_BRACKET] = OpenArrayToken
+_STATE_CLASS_BY_FIRST_BYTE[RIGHT_SQUARE_BRACKET] = None
+_TOKEN_BY_FIRST_BYTE[RIGHT_SQUARE_BRACKET] = CloseArrayToken
+del _c
+
+
 class PDFTokenizer:
     """Tokenizer for an obj"""
 
     @staticmethod
     def create(stream: BinaryIO) -> "PDFTokenizer":
+        if isinstance(stream, io.BytesIO):  # the data is already in memory
+            return RegexTokenizer(stream.getvalue(), stream.tell(), stream)
+        elif isinstance(stream, mmap.mmap):
+            return RegexTokenizer(stream, stream.tell(), stream)
         return PDFTokenizer(BinaryStreamWrapper(stream))
 
+    @staticmethod
+    def from_bytes(buf: bytes) -> "PDFTokenizer":
+        return RegexTokenizer(buf)
+
     def __init__(self, stream_wrapper: StreamWrapper):
         self._stream_wrapper = stream_wrapper
         self._state = cast(State, StartState())
@@ -362,3 +442,224 @@ class PDFTokenizer:
 
     def unget(self):
         self._stream_wrapper.unget()
+
+    def release(self):
+        """
+        Move the stream to the end of the last token.
+        """
+        self._stream_wrapper.release()
+
+
+# The alternatives of the regex, in the order of the groups, after the
+# white-space that the StartState skips. Names, numbers and words need the
+# byte that follows them to end, as in the states above: they are not matched
+# at the end of the buffer. The last alternative matches the comments and
+# the white-space that is not followed by a token.
+_NAME, _OPEN_DICT, _CLOSE_DICT, _HEX_STRING, _STRING, _INTEGER, _REAL, \
+    _OPEN_ARRAY, _CLOSE_ARRAY, _WORD, _SKIP = range(1, 12)
+_TOKEN_RE = re.compile(
+    rb"[ \r\n]*"
+    rb"(?:(/[^\x00\t\n\x0c\r ()<>\[\]{}/%]*(?=[\x00\t\n\x0c\r ()<>\[\]{}/%]))"
+    rb"|(<<)"
+    rb"|(>>)"
+    rb"|(<[0-9A-Fa-f\x00\t\n\x0c\r ]*>)"
+    # a string with at most one level of nested parens
+    rb"|(\((?:[^\\()]|\\[\x00-\xff])*"
+    rb"(?:\((?:[^\\()]|\\[\x00-\xff])*\)(?:[^\\()]|\\[\x00-\xff])*)*\))"
+    # 7.3.3 Numeric Objects: a second dot starts a new number
+    rb"|([+\-0-9][0-9]*(?=[^0-9.]))"
+    rb"|([+\-0-9]?[0-9]*\.[0-9]*(?=[^0-9]))"
+    rb"|(\[)"
+    rb"|(\])"
+    rb"|([^/<>\[\](%+\-.0-9 \r\n][A-Za-z*]*(?=[^A-Za-z*]))"
+    rb"|([ \r\n]+|%[^\r\n]*\r*\n?))"
+)
+
+# 7.3.4.2 Literal Strings: the bytes that open or close a string or start an
+# escape sequence, and the escape sequences, as the StringState handles them.
+_STRING_SPECIAL_RE = re.compile(rb"[()\\]")
+_ESCAPE_RE = re.compile(rb"\\(?:[0-9]{1,3}|\r\n|[\x00-\xff])")
+
+
+def _unescaped_by_sequence() -> Dict[bytes, bytes]:
+    """
+    :return: the bytes of every escape sequence matched by _ESCAPE_RE
+    """
+    unescaped_by_sequence = {}
+    for c, escaped in enumerate(_ESCAPED_BYTE):
+        sequence = bytes((BACKSLASH, c))
+        if escaped is not None:
+            unescaped_by_sequence[sequence] = bytes((escaped,))
+        elif c in (CARRIAGE_RETURN, LINE_FEED):  # an escaped end of line
+            unescaped_by_sequence[sequence] = b""
+        else:
+            unescaped_by_sequence[sequence] = sequence
+    unescaped_by_sequence[b"\\\r\n"] = b""
+    for digit_count in range(1, 4):
+        for digits in product(DIGITS, repeat=digit_count):
+            value = 0
+            for d in digits:
+                value = value * 8 + d - ZERO_DIGIT
+            # high-order overflow shall be ignored
+            unescaped_by_sequence[bytes((BACKSLASH,) + digits)] = bytes(
+                (value & 0xFF,))
+    return unescaped_by_sequence
+
+
+_UNESCAPED_BY_SEQUENCE = _unescaped_by_sequence()
+
+
+def _unescape(m: re.Match) -> bytes:
+    return _UNESCAPED_BY_SEQUENCE[m.group()]
+
+
+class RegexTokenizer(PDFTokenizer):
+    """
+    Tokenizer for an obj in memory. The usual tokens are matched by a regex,
+    the deeply nested strings by a scan of their parentheses and the other
+    tokens (errors, end of the buffer) by the state machine.
+    """
+
+    def __init__(self, buf: bytes, pos: int = 0,
+                 stream: Optional[BinaryIO] = None):
+        """
+        :param buf: the buffer
+        :param pos: the position of the first byte to read
+        :param stream: if not None, the stream that holds the buffer. It is
+                       moved after each token as the state machine would do.
+        """
+        self._state = cast(State, StartState())
+        self._buf = buf
+        self._pos = pos  # the next byte for the state machine
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[Any]:
+        stream = self._stream
+        if stream is None:  # e.g. a content stream
+            return self._iter_buffer()
+        return self._iter_stream(stream)
+
+    def _iter_stream(self, stream: BinaryIO) -> Iterator[Any]:
+        for token in self._iter_buffer():
+            stream.seek(self._pos)
+            yield token
+        stream.seek(len(self._buf))
+
+    def _iter_buffer(self) -> Iterator[Any]:
+        """
+        Before a token is yielded, `self._pos` is set to the position of the
+        first byte that was not consumed by the state machine.
+        """
+        buf = self._buf
+        match = _TOKEN_RE.match
+        name_by_bytes = _NAME_BY_BYTES
+        n = len(buf)
+        pos = self._pos
+        while pos < n:
+            m = match(buf, pos)
+            if m is None:
+                if buf[pos] == LEFT_PARENTHESIS:  # a deeply nested string
+                    ret, pos = self._string_token(pos)
+                else:
+                    ret, pos = self._state_machine_token(pos)
+                if ret is None:
+                    break
+                self._pos = pos
+            else:
+                kind = m.lastindex
+                start = m.start(kind)
+                self._pos = pos = m.end()
+                if kind == _SKIP:
+                    continue
+                elif kind == _INTEGER:
+                    ret = NumberObject(buf[start:pos], False)
+                    self._pos = pos + 1
+                elif kind == _WORD:
+                    ret = WordToken(buf[start:pos])
+                    self._pos = pos + 1
+                elif kind == _REAL:
+                    ret = NumberObject(buf[start:pos], True)
+                    self._pos = pos + 1
+                elif kind == _NAME:
+                    bs = buf[start:pos]
+                    ret = name_by_bytes.get(bs)
+                    if ret is None:
+                        ret = _get_name(bs)
+                    self._pos = pos + 1
+                elif kind == _STRING:
+                    bs = buf[start + 1:pos - 1]
+                    if BACKSLASH in bs:
+                        bs = _ESCAPE_RE.sub(_unescape, bs)
+                    ret = StringObject(bs)
+                elif kind == _OPEN_ARRAY:
+                    ret = OpenArrayToken
+                elif kind == _CLOSE_ARRAY:
+                    ret = CloseArrayToken
+                elif kind == _OPEN_DICT:
+                    ret = OpenDictToken
+                elif kind == _CLOSE_DICT:
+                    ret = CloseDictToken
+                else:  # _HEX_STRING
+                    hex_string = buf[start + 1:pos - 1].translate(
+                        None, WHITESPACES)
+                    if len(hex_string) % 2 == 1:
+                        hex_string += b"0"
+                    ret = StringObject(binascii.unhexlify(hex_string))
+            yield ret
+
+    def _string_token(self, pos: int) -> Tuple[Any, int]:
+        """
+        Jump from a parenthesis or a backslash to the next one.
+
+        :param pos: the position of the left parenthesis
+        :return: the string (None if it is not closed) and the position of
+                 the next byte.
+        """
+        buf = self._buf
+        search = _STRING_SPECIAL_RE.search
+        depth = 0
+        escaped = False
+        i = pos + 1
+        while True:
+            m = search(buf, i)
+            if m is None:
+                return None, len(buf)
+            i = m.end()
+            c = buf[i - 1]
+            if c == BACKSLASH:
+                escaped = True
+                i += 1
+            elif c == LEFT_PARENTHESIS:
+                depth += 1
+            elif depth:
+                depth -= 1
+            else:
+                break
+        bs = buf[pos + 1:i - 1]
+        if escaped:
+            bs = _ESCAPE_RE.sub(_unescape, bs)
+        return StringObject(bs), i
+
+    def _state_machine_token(self, pos: int) -> Tuple[Any, int]:
+        """
+        :param pos: the position of the first byte of the token
+        :return: the token (None if there is no more token) and the position
+                 of the next byte.
+        """
+        buf = self._buf
+        n = len(buf)
+        self._state = StartState()
+        self._pos = pos
+        while self._pos < n:
+            c = buf[self._pos]
+            self._pos += 1
+            ret = self._state.handle(self, c)
+            if ret is not None:
+                return ret, self._pos
+        return None, n
+
+    def unget(self):
+        self._pos -= 1
+
+    def release(self):
+        pass  # the stream, if any, is moved after each token
@@ -17,6 +17,8 @@
 #     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import io
 import logging
+from collections import Counter
+from operator import attrgetter
 from typing import Iterator, Iterable, List, Optional, TextIO
 
 from base import TextElement, NewPage, NewText, Text
@@ -69,58 +71,53 @@ class TextExtractor:
         contents = page_object[b"/Contents"]
         self._logger.debug("Contents: %s",
                            self.document.get_object(contents))
-        stream_wrapper = self.document.get_stream(contents)
+        data = self.document.get_stream_data(contents)
+        text_state = self.text_state
+        is_other_line = self._parameters.is_other_line
+        # the arguments of the logs are built only if the level is enabled
+        debug = self._logger.isEnabledFor(logging.DEBUG)
+        info = self._logger.isEnabledFor(logging.INFO)
         font = Font(STD_ENCODING, {}, 0.0)
+        font_space_width = font.get_space_width()
         encoding = STD_ENCODING
-        for x in ContentParser().parse_content(stream_wrapper):
+        for x in ContentParser().parse_content(data):
             # TODO : if space more than one em (space width), new block
-            if isinstance(x, SetFont):  # Tf
-                self._logger.debug("SetFont %s", x.name)
-                font = self.document.get_font(x.name)
-                encoding = font.encoding
-                self.text_state.text_font_size = x.size
-            elif isinstance(x, SetTextRise):  # Ts
-                self._logger.debug("SetTextRise %s", x.rise)
-                self.text_state.text_rise = x.rise
-            elif isinstance(x, SetHorizScaling):  # Tz
-                self._logger.debug("SetHorizScaling %s", x.scale)
-                self.text_state.horizontal_scaling = x.scale
-            elif isinstance(x, SetCharSpacing):  # Tc
-                self._logger.debug("SetCharSpacing %s", x.char_space)
-                self.text_state.char_space = x.char_space
-            elif isinstance(x, SetWordSpacing):  # Tw
-                self._logger.debug("SetWordSpacing %s", x.word_space)
-                self.text_state.word_space = x.word_space
-            elif isinstance(x, ShowTextString):  # Tj
+            op_class = x.__class__
+            if op_class is ShowTextString:  # Tj
                 bs = x.bs
                 try:
-                    text = "".join(
-                        encoding.get(y, '\ufffd')
-                        for y in bs if y
-                    )  # todo : TWO BYTES, EG. "� " = " "
-                    self._logger.info("Bytes %s -> %s", repr(bs), repr(text))
-                    x = self.text_state.x
-                    y = self.text_state.y
-                    font_size = self.text_state.font_size
-                    w = self._get_width(font, bs, font_size)
-                    font_space_width = font.get_space_width()
+                    text = font.decode(bs)  # todo : TWO BYTES, EG. "� " = " "
+                    if info:
+                        self._logger.info("Bytes %s -> %s", repr(bs),
+                                          repr(text))
+                    x = text_state.x
+                    y = text_state.y
+                    font_size = text_state.font_size
+                    char_space = text_state.char_space
+                    w = self._get_width(font, bs, char_space,
+                                        text_state.word_space,
+                                        text_state.horizontal_scaling)
 
                     # between chars: change text now
-                    cs = 1000 * self.text_state.char_space
+                    cs = 1000 * char_space
                     if 0 < font_space_width < cs:
                         factor = int(cs / font_space_width)
                         text = (" " * factor).join(list(text))
 
                     # newline
-                    delta_y = 0 if self.text_state.last_y is None else y - self.text_state.last_y
-                    self._logger.debug("Delta Y: %s", delta_y)
-                    if self._parameters.is_other_line(delta_y, font_size):
+                    last_y = text_state.last_y
+                    delta_y = 0 if last_y is None else y - last_y
+                    if debug:
+                        self._logger.debug("Delta Y: %s", delta_y)
+                    if is_other_line(delta_y, font_size):
                         yield NewText()
                         # text = "\n" + text
                     else:
                         # before
-                        delta_x = 0 if self.text_state.last_x is None else x - self.text_state.last_x
-                        self._logger.debug("Delta X: %s", delta_x)
+                        last_x = text_state.last_x
+                        delta_x = 0 if last_x is None else x - last_x
+                        if debug:
+                            self._logger.debug("Delta X: %s", delta_x)
                         if font_size:
                             temp = (delta_x * 1000) / font_size
                             if 0 < font_space_width < temp:
@@ -128,68 +125,121 @@ class TextExtractor:
                                 factor = int(temp / font_space_width)
                                 # text = (" " * factor) + text
 
-                    self.text_state.shift_left_tm(w / 1000)
-                    width = self.text_state.x - x
+                    text_state.shift_left_tm(w / 1000)
+                    width = text_state.x - x
                     t = Text(text, x, y, width, 0.0, font_size,
                              font_space_width)
-                    self._logger.info("Text => %s (y=%s)", t, y)
+                    if info:
+                        self._logger.info("Text => %s (y=%s)", t, y)
                     # 9.2.4 Glyph Positioning and Metrics
-                    self.text_state.store_xy()
+                    text_state.store_xy()
                     yield t
                 except (IndexError, KeyError):
                     self._logger.exception("%s %s", repr(bs),
                                            encoding)
-            elif isinstance(x, MoveStartNextLine):  # Td
-                font_size = self.text_state.font_size
-                if self._parameters.is_other_line(x.ty, font_size):
-                    self._logger.debug("Newline %s", x)
-                else:
-                    self._logger.debug("Ignore Newline %s", x)
-                self.text_state.move_new_line(x.tx, x.ty)
-            elif isinstance(x, SetTextMatrix):  # Tm
-                self._logger.debug("SetTextMatrix %s", x)
-                self.text_state.set_text_matrix(x.tm)
-            elif isinstance(x, UpdateTextMatrix):  # TJ part
-                self._logger.debug("UpdateTextMatrix %s", x)
+            elif op_class is SetFont:  # Tf
+                if debug:
+                    self._logger.debug("SetFont %s", x.name)
+                font = self.document.get_font(x.name)
+                font_space_width = font.get_space_width()
+                encoding = font.encoding
+                text_state.text_font_size = x.size
+            elif op_class is SetTextRise:  # Ts
+                if debug:
+                    self._logger.debug("SetTextRise %s", x.rise)
+                text_state.text_rise = x.rise
+            elif op_class is SetHorizScaling:  # Tz
+                if debug:
+                    self._logger.debug("SetHorizScaling %s", x.scale)
+                text_state.horizontal_scaling = x.scale
+            elif op_class is SetCharSpacing:  # Tc
+                if debug:
+                    self._logger.debug("SetCharSpacing %s", x.char_space)
+                text_state.char_space = x.char_space
+            elif op_class is SetWordSpacing:  # Tw
+                if debug:
+                    self._logger.debug("SetWordSpacing %s", x.word_space)
+                text_state.word_space = x.word_space
+            elif op_class is MoveStartNextLine:  # Td
+                font_size = text_state.font_size
+                if debug:
+                    if is_other_line(x.ty, font_size):
+                        self._logger.debug("Newline %s", x)
+                    else:
+                        self._logger.debug("Ignore Newline %s", x)
+                text_state.move_new_line(x.tx, x.ty)
+            elif op_class is SetTextMatrix:  # Tm
+                if debug:
+                    self._logger.debug("SetTextMatrix %s", x)
+                text_state.set_text_matrix(x.tm)
+            elif op_class is UpdateTextMatrix:  # TJ part
+                if debug:
+                    self._logger.debug("UpdateTextMatrix %s", x)
                 # 9.4.4 Text Space Details
-                self.text_state.shift_left_tm(-x.w / 1000)
-            elif isinstance(x, MoveStartNextLineWoParams):  # T*
-                self._logger.debug("Ignore Newline WO Params %s", x)
-                self.text_state.move_new_line(0, -self.text_state.text_leading)
-            elif isinstance(x, SetTextLeading):  # TL
-                self._logger.debug("SetTextLeading %s", x.leading)
-                self.text_state.text_leading = x.leading
-            else:
+                text_state.shift_left_tm(-x.w / 1000)
+            elif op_class is MoveStartNextLineWoParams:  # T*
+                if debug:
+                    self._logger.debug("Ignore Newline WO Params %s", x)
+                text_state.move_new_line(0, -text_state.text_leading)
+            elif op_class is SetTextLeading:  # TL
+                if debug:
+                    self._logger.debug("SetTextLeading %s", x.leading)
+                text_state.text_leading = x.leading
+            elif debug:
                 self._logger.debug("*Ignore %s", x)
 
-    def _get_width(self, font: Font, bs: bytes, a):
+    @staticmethod
+    def _get_width(font: Font, bs: bytes, char_space: float,
+                   word_space: float, horizontal_scaling: float):
         """9.4.4 Text Space Details"""
-        space_count = sum(1 for i in bs if i == 32)
-        return (sum(
-            font.get_pos_width(i)
-            for i in bs
-        ) + self.text_state.char_space * (len(bs) - 1) * 1000
-                + self.text_state.word_space * space_count * 1000) * (
-                self.text_state.horizontal_scaling / 100.0)
+        space_count = bs.count(32)
+        return (font.get_bytes_width(bs)
+                + char_space * (len(bs) - 1) * 1000
+                + word_space * space_count * 1000) * (
+                horizontal_scaling / 100.0)
+
+
+_get_x = attrgetter("x")
+_get_y = attrgetter("y")
+
+
+def _sorted_by_position(txts: List[Text]) -> List[Text]:
+    """
+    :return: the texts from top to bottom, then from left to right
+    """
+    ret = sorted(txts, key=_get_x)
+    ret.sort(key=_get_y, reverse=True)  # stable: x order is kept
+    return ret
+
+
+def _mode(values: Iterable[float]) -> float:
+    """
+    :return: the most common value, the first one in case of a tie
+    """
+    return Counter(values).most_common(1)[0][0]
 
 
 class TextProcessor:
     def process_texts(self, d: io.StringIO, texts: Iterable[TextElement]):
         cur_txt = None
+        cur_parts = []  # the strings of cur_txt, joined at the end
         txts = []
         for text in texts:
             if isinstance(text, Text):
                 if cur_txt is None:
                     cur_txt = text
+                    cur_parts = [text.s]
                 else:
-                    cur_txt.s += text.s
+                    cur_parts.append(text.s)
                     cur_txt.width = text.x + text.width - cur_txt.x
             elif isinstance(text, NewText):
                 if cur_txt is not None:
+                    cur_txt.s = "".join(cur_parts)
                     txts.append(cur_txt)
                     cur_txt = None
             elif isinstance(text, NewPage):
                 if cur_txt is not None:
+                    cur_txt.s = "".join(cur_parts)
                     txts.append(cur_txt)
 
                 if txts:
@@ -198,16 +248,14 @@ class TextProcessor:
                 txts = []
 
     def merge_texts(self, d: io.StringIO, txts: List[Text]):
-        from statistics import mode
-
-        font_size = mode(t.font_size for t in txts)
+        font_size = _mode(t.font_size for t in txts)
         if font_size == 0:
             font_size = min([
                 t.font_size
                 for t in txts
                 if t.font_size > 0
             ], default=10)
-        font_space_width = mode(
+        font_space_width = _mode(
             t.font_space_width * t.font_size for t in txts) / 1000
         if font_space_width == 0:
             font_space_width = min([
@@ -219,63 +267,60 @@ class TextProcessor:
         last_cx = 0
         last_cy = 0
         last_ty = 0
-        for t in sorted(txts, key=lambda t: (-t.y, t.x)):
-            if isinstance(t, Text):
-                cy = int(t.y / font_size)
-                factor_y = (last_cy - cy)
-                if factor_y > 1 and (last_ty - t.y) < 1.5 * font_size:
-                    factor_y = 1
-
-                last_cy = cy
-                last_ty = t.y
-
-                cx = int(t.x / font_space_width)
-                if factor_y != 0:  # new line
-                    last_cx = 0
-                factor_x = cx - last_cx
-                if factor_y > 0:
-                    d.write("\n" * factor_y)
-                if factor_x > 0:
-                    d.write(" " * factor_x)
-                    last_cx = cx + len(t.s)
-
-                d.write(t.s)
+        for t in _sorted_by_position(txts):
+            cy = int(t.y / font_size)
+            factor_y = (last_cy - cy)
+            if factor_y > 1 and (last_ty - t.y) < 1.5 * font_size:
+                factor_y = 1
+
+            last_cy = cy
+            last_ty = t.y
+
+            cx = int(t.x / font_space_width)
+            if factor_y != 0:  # new line
+                last_cx = 0
+            factor_x = cx - last_cx
+            if factor_y > 0:
+                d.write("\n" * factor_y)
+            if factor_x > 0:
+                d.write(" " * factor_x)
+                last_cx = cx + len(t.s)
+
+            d.write(t.s)
         d.write("\n>>>>>>>>>>>>>>>>\n")
 
 class AlternativeTextProcessor(TextProcessor):
     def merge_texts(self, d, txts: List[Text]):
         last_x = 0
         last_y = 0
-        for t in sorted(txts, key=lambda t: (-t.y, t.x)):
-            if isinstance(t, Text):
-                if last_y is not None:
-                    delta_y = last_y - t.y
-                    if delta_y > t.font_size > 0:
-                        factor = int(delta_y / t.font_size)
-                        d.write("\n" * factor)
-                        new_line = True
-                        last_x = 0  # None
-
-                    if last_x is not None:
-                        delta_x = t.x - last_x
-                        if t.font_size > 0:
-                            temp = (delta_x * 1000) / t.font_size
-                            if 0 < t.font_space_width < temp:
-                                factor = int(
-                                    temp / t.font_space_width)
-                                d.write(" " * factor)
-
-                d.write(t.s)
-                last_x = t.x + t.width
-                last_y = t.y
+        for t in _sorted_by_position(txts):
+            if last_y is not None:
+                delta_y = last_y - t.y
+                if delta_y > t.font_size > 0:
+                    factor = int(delta_y / t.font_size)
+                    d.write("\n" * factor)
+                    new_line = True
+                    last_x = 0  # None
+
+                if last_x is not None:
+                    delta_x = t.x - last_x
+                    if t.font_size > 0:
+                        temp = (delta_x * 1000) / t.font_size
+                        if 0 < t.font_space_width < temp:
+                            factor = int(
+                                temp / t.font_space_width)
+                            d.write(" " * factor)
+
+            d.write(t.s)
+            last_x = t.x + t.width
+            last_y = t.y
         d.write("\n>>>>>>>>>>>>>>>>\n")
 
 
 class RawTextProcessor(TextProcessor):
     def merge_texts(self, d, txts: List[Text]):
         for t in txts:
-            if isinstance(t, Text):
-                d.write(t.s + "\n")
+            d.write(t.s + "\n")
         d.write("\n>>>>>>>>>>>>>>>>\n")
 
 
@@ -0,0 +1,45 @@
+import unittest
+
+from content_parser import ContentParser
+
+
+class ContentParserTestCase(unittest.TestCase):
+    def test_parse_to_unicode(self):
+        data = b"""/CIDInit /ProcSet findresource begin
+12 dict begin
+begincmap
+1 begincodespacerange
+<0000> <FFFF>
+endcodespacerange
+4 beginbfchar
+<41> <0041>
+<0102> <00E9>
+<0103> <00660066>
+<0104> <D83DDE00>
+endbfchar
+3 beginbfrange
+<0200> <0202> <0061>
+<0210> <0211> <00660069>
+<0220> <0222> [<0058> <00660066> <D83DDE00>]
+endbfrange
+endcmap
+"""
+        self.assertEqual({
+            0x41: "A", 0x0102: "é", 0x0103: "ff", 0x0104: "\U0001f600",
+            0x0200: "a", 0x0201: "b", 0x0202: "c",
+            0x0210: "fi", 0x0211: "fj",
+            0x0220: "X", 0x0221: "ff", 0x0222: "\U0001f600",
+        }, ContentParser().parse_to_unicode(data))
+
+    def test_parse_to_unicode_one_code_unit(self):
+        data = b"""2 beginbfchar
+<01> <0041>
+<02> <0042>
+endbfchar
+"""
+        self.assertEqual({1: "A", 2: "B"},
+                         ContentParser().parse_to_unicode(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,15 @@
 import io
+import itertools
 import logging
+import re
 import unittest
 from pathlib import Path
 from unittest import mock
 
 from base import (NameObject, ArrayObject, DictObject,
-                  IndirectRef, NumberObject)
+                  IndirectRef, NumberObject, BooleanObject, NullObject)
 from font_parser import FontParser
-from parser import PDFParser, ObjectParser
+from parser import PDFParser, ObjectParser, reverse_reader, BUF_SIZE
 from pdf_encodings import ENCODING_BY_NAME, UNICODE_BY_GLYPH_NAME
 from tokenizer import PDFTokenizer, BinaryStreamWrapper
 from tool import TextProcessor, extract_text
@@ -76,6 +78,36 @@ class TestCase(unittest.TestCase):
             })
             , ObjectParser(tokenizer).parse())
 
+    def test_object_parser_keywords(self):
+        tokenizer = PDFTokenizer.create(
+            io.BytesIO(b"<< /A false /B true /C null >>"))
+        self.assertEqual(DictObject({
+            b'/A': BooleanObject(False),
+            b'/B': BooleanObject(True),
+            b'/C': NullObject,
+        }), ObjectParser(tokenizer).parse())
+
+    def test_object_parser_bad_dict(self):
+        for bs in [b"<< /A 1 /B >>", b"<< /A 1 2 3 >>", b"<< (A) 1 >>"]:
+            tokenizer = PDFTokenizer.create(io.BytesIO(bs))
+            with self.assertRaises(Exception):
+                ObjectParser(tokenizer).parse()
+
+    def test_reverse_reader(self):
+        for eol in [b"\n", b"\r", b"\r\n"]:
+            # move the block boundaries over every byte of the tail
+            for zero_count, blank_count in itertools.product(
+                    range(BUF_SIZE), range(BUF_SIZE // len(eol) + 1)):
+                data = eol.join(
+                    [b"trailer", b"<< /Size 10 /Root 1 0 R >>",
+                     b"startxref", b"0" * zero_count + b"18799", b"%%EOF"]
+                ) + eol * blank_count
+                expected = re.split(rb"\r\n|\r|\n", data)[::-1]
+                self.assertEqual(expected,
+                                 list(reverse_reader(io.BytesIO(data))))
+                parser = PDFParser(io.BytesIO(data))
+                self.assertEqual(18799, parser._find_start_xref())
+
     def test_stream_wrapper(self):
         bsw = BinaryStreamWrapper(io.BytesIO(b"foo bar baz"))
         bsw.unget()
@@ -151,6 +183,48 @@ class FontParserTestCase(unittest.TestCase):
             encoding_object, be)
         print(encoding)
 
+    def _parse_font(self, bs):
+        document = mock.Mock()
+        document.get_object = lambda x: x
+        document.get_stream_data = lambda x: b"""1 beginbfchar
+<01> <0041>
+endbfchar
+"""
+        font_object = ObjectParser(
+            PDFTokenizer.create(io.BytesIO(bs))).parse()
+        return FontParser(document, UNICODE_BY_GLYPH_NAME,
+                          ENCODING_BY_NAME).parse_font_object(font_object)
+
+    def test_type1_font_encoding(self):
+        font = self._parse_font(b"""<< /Type /Font /Subtype /Type1
+/Encoding /WinAnsiEncoding /ToUnicode << >> >>""")
+        self.assertIs(ENCODING_BY_NAME[b"/WinAnsiEncoding"], font.encoding)
+
+    def test_type1_font_unknown_encoding(self):
+        # a Type 1 font does not use the /ToUnicode CMap
+        font = self._parse_font(b"""<< /Type /Font /Subtype /Type1
+/Encoding /Unknown /ToUnicode << >> >>""")
+        self.assertEqual({}, font.encoding)
+        font = self._parse_font(b"""<< /Type /Font /Subtype /Type1
+/Encoding /Unknown >>""")
+        self.assertEqual({}, font.encoding)
+
+    def test_font_unknown_base_encoding(self):
+        for subtype in [b"/Type1", b"/TrueType"]:
+            font = self._parse_font(
+                b"<< /Type /Font /Subtype " + subtype
+                + b" /Encoding << /BaseEncoding /Foo >> >>")
+            self.assertEqual({}, font.encoding)
+            self.assertEqual("\ufffd\ufffd", font.decode(b"ab"))
+
+    def test_type0_font_unknown_encoding(self):
+        font = self._parse_font(b"""<< /Type /Font /Subtype /Type0
+/Encoding /Identity-H /ToUnicode << >> >>""")
+        self.assertEqual({1: "A"}, font.encoding)
+        with self.assertRaises(KeyError):
+            self._parse_font(b"""<< /Type /Font /Subtype /Type0
+/Encoding /Identity-H >>""")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,13 @@
+import importlib.util
+import struct
 import unittest
 import zlib
+from hashlib import md5
 from pathlib import Path
+from unittest import mock
 
-from minimal_pdf_parser.security import ARC4, StandardEncrypterFactory, Encrypter
+from minimal_pdf_parser.security import (
+    ARC4, ARC4_iterator, StandardEncrypterFactory, Encrypter, PADDING_STRING)
 
 
 class SecurityTestCase(unittest.TestCase):
@@ -26,6 +31,26 @@ class SecurityTestCase(unittest.TestCase):
             b"\xd6J\xb1\\t4\xff\xe1s.c\x88'Od\xc4(\xbfN^Nu\x8aAd\x00NV\xff\xfa\x01\x08")
         self.assertEqual(b'\xa9\x05\xe0\xb9\x9c', encryption.create().encryption_key)
 
+    def test_key_rev4_no_metadata(self):
+        doc_id = [b'\x95\x97\xc6\x18\xbc\x90\xaf\xa4\xa0x\xcar\xb2\xdd\x06\x1c',
+                  b'Hr`\x07\xf4\x83\xd5G\xa8\xbe\xffn\x9c\xda\x07/']
+        owner = bytes(range(32))
+        user = bytes(range(32, 64))
+        encryption = StandardEncrypterFactory(
+            doc_id, 4, 4, 128, -1028, owner, user, False)
+
+        # Algorithm 2, step f): add 0xFFFFFFFF when rev >= 4 and the
+        # metadata is not encrypted
+        digest = md5(PADDING_STRING + owner + struct.pack("<i", -1028)
+                     + doc_id[0] + b"\xff\xff\xff\xff").digest()
+        for _ in range(50):
+            digest = md5(digest[:16]).digest()
+        self.assertEqual(digest[:16], encryption.create().encryption_key)
+
+        encryption = StandardEncrypterFactory(
+            doc_id, 4, 4, 128, -1028, owner, user, True)
+        self.assertNotEqual(digest[:16], encryption.create().encryption_key)
+
     def test_key_pypdf2(self):
         import PyPDF2
         with Path("../fixture/PDF32000_2008.pdf").open("rb") as s:
@@ -59,5 +84,42 @@ class SecurityTestCase(unittest.TestCase):
         self.assertEqual(ddata[10:20], ec.chunk(data[10:20]))
 
 
+@unittest.skipUnless(importlib.util.find_spec("Crypto"),
+                     "PyCryptodome is not installed")
+class PyCryptodomeTestCase(unittest.TestCase):
+    """The PyCryptodome RC4 cipher shall give the pure Python output"""
+    DATA = bytes(range(256)) * 5
+
+    def _pure_python_iterator(self, key):
+        with mock.patch("minimal_pdf_parser.security._ARC4_cipher", None):
+            return ARC4_iterator(key)
+
+    def test_one_shot(self):
+        for key in [b"\xa9\x05\xe0\xb9\x9c", bytes(range(16)), b"k" * 256]:
+            cipher_iterator = ARC4_iterator(key)
+            self.assertIsNotNone(cipher_iterator._cipher)
+            self.assertEqual(
+                self._pure_python_iterator(key).chunk(self.DATA),
+                cipher_iterator.chunk(self.DATA))
+
+    def test_chunks(self):
+        key = bytes(range(16))
+        cipher_iterator = ARC4_iterator(key)
+        pure_python_iterator = self._pure_python_iterator(key)
+        for start, end in [(0, 1), (1, 100), (100, 101), (101, 1280)]:
+            self.assertEqual(
+                pure_python_iterator.chunk(self.DATA[start:end]),
+                cipher_iterator.chunk(self.DATA[start:end]))
+
+    def test_rejected_key_length(self):
+        # PyCryptodome accepts 1 to 256 bytes: fall back to pure Python
+        key = bytes(range(256)) + b"k"
+        cipher_iterator = ARC4_iterator(key)
+        self.assertIsNone(cipher_iterator._cipher)
+        self.assertEqual(
+            self._pure_python_iterator(key).chunk(self.DATA),
+            cipher_iterator.chunk(self.DATA))
+
+
 if __name__ == "__main__":
     unittest.main()
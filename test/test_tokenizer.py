@@ -2,7 +2,8 @@ import io
 import unittest
 from pathlib import Path
 
-from minimal_pdf_parser.tokenizer import PDFTokenizer
+from minimal_pdf_parser.tokenizer import (
+    PDFTokenizer, RegexTokenizer, BinaryStreamWrapper)
 from minimal_pdf_parser.base import OpenArrayToken, CloseArrayToken, StringObject, NameObject
 
 
@@ -119,6 +120,105 @@ are the same.)"""
             print(x)
 
 
+class RegexTokenizerTestCase(unittest.TestCase):
+    """The RegexTokenizer shall return the tokens of the state machine"""
+
+    def _assert_same_tokens(self, s, expected_count):
+        tokens = list(RegexTokenizer(s))
+        for buf_size in (3, 4096):
+            expected_tokens = list(PDFTokenizer(
+                BinaryStreamWrapper(io.BytesIO(s), buf_size)))
+            self.assertEqual([repr(t) for t in expected_tokens],
+                             [repr(t) for t in tokens])
+        self.assertEqual(expected_count, len(tokens))
+        return tokens
+
+    def test_nested_strings(self):
+        s = b"(a (b (c (d) e) f) g) (x (y) z) "
+        tokens = self._assert_same_tokens(s, 2)
+        self.assertEqual(b"a (b (c (d) e) f) g", tokens[0].bs)
+        self.assertEqual(b"x (y) z", tokens[1].bs)
+
+    def test_escaped_strings(self):
+        s = rb"(\\\(\)\n\r\t\b\f) (a \( (b \) c) \(d)"
+        tokens = self._assert_same_tokens(s, 2)
+        self.assertEqual(b"\\()\n\r\t\b\x0c", tokens[0].bs)
+        self.assertEqual(b"a ( (b ) c) (d", tokens[1].bs)
+
+    def test_escaped_end_of_line(self):
+        # a backslash at the end of a line continues the string
+        for s, expected_bs in [
+            (b"(a\\\rb)", b"ab"),
+            (b"(a\\\nb)", b"ab"),
+            (b"(a\\\r\nb)", b"ab"),
+            (b"(a\\\rb\nc)", b"ab\nc"),
+            (b"(a\\\r\n\nb)", b"a\nb"),
+            (b"(a\\\r\rb)", b"a\rb"),
+            (b"(a ((x\\\r\ny)) b)", b"a ((xy)) b"),
+        ]:
+            tokens = self._assert_same_tokens(s, 1)
+            self.assertEqual(expected_bs, tokens[0].bs)
+
+    def test_octal_overflow(self):
+        s = rb"(\400\777\1234)"
+        tokens = self._assert_same_tokens(s, 1)
+        self.assertEqual(b"\x00\xff\x534", tokens[0].bs)
+
+    def test_hex_strings(self):
+        # white-space is ignored and a missing final digit is 0
+        for s, expected_bs in [
+            (b"<48 65 6C\n6C 6F>", b"Hello"),
+            (b"<\t41\x0c42\r\n43\x00>", b"ABC"),
+            (b"<486>", b"H`"),
+            (b"< 4 >", b"@"),
+            (b"<48 6>", b"H`"),
+            (b"< >", b""),
+            (b"<>", b""),
+        ]:
+            tokens = self._assert_same_tokens(s, 1)
+            self.assertEqual(expected_bs, tokens[0].bs)
+
+    def test_malformed_numbers(self):
+        s = b"1.2.3 -.5 +7 4. "
+        tokens = self._assert_same_tokens(s, 5)
+        self.assertEqual([1.2, .3, -.5, 7, 4.],
+                         [token.value for token in tokens])
+
+    def test_end_of_buffer(self):
+        # names, numbers and words need a following byte to end
+        for s, expected_count in [
+            (b"1 0 obj", 2), (b"/Name", 0), (b"[12", 1), (b"(abc", 0),
+            (b"(a (b) c", 0), (b"<<", 1), (b"<4142", 0), (b"[/A]", 3),
+        ]:
+            self._assert_same_tokens(s, expected_count)
+
+    def test_stream_position(self):
+        s = b"1 0 obj\n<< /Length 10 >>\nstream\r\n0123456789"
+        for count in range(1, 9):
+            stream = io.BytesIO(s)
+            tokenizer = PDFTokenizer.create(stream)
+            self.assertIsInstance(tokenizer, RegexTokenizer)
+            tokens = self._read_tokens(tokenizer, count)
+
+            expected_stream = io.BytesIO(s)
+            expected_tokenizer = PDFTokenizer(
+                BinaryStreamWrapper(expected_stream, 4))
+            expected_tokens = self._read_tokens(expected_tokenizer, count)
+
+            self.assertEqual([repr(t) for t in expected_tokens],
+                             [repr(t) for t in tokens])
+            self.assertEqual(expected_stream.tell(), stream.tell())
+
+    @staticmethod
+    def _read_tokens(tokenizer, count):
+        tokens = []
+        for token in tokenizer:
+            tokens.append(token)
+            if len(tokens) == count:
+                break
+        tokenizer.release()
+        return tokens
+
 
 if __name__ == '__main__':
     unittest.main()